@@ -5,62 +5,363 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import base64
+import importlib.util
 import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import os
+import platform
+import re
+import struct
 from datetime import datetime
 
-# 尝试导入PDF相关库，如果失败则使用简化版本
-try:
-    import plotly.io as pio
-    from matplotlib import pyplot as plt
-    import seaborn as sns
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    # 尝试导入PIL用于图像处理
-    try:
-        from PIL import Image as PILImage
-        PIL_AVAILABLE = True
-    except ImportError:
-        PIL_AVAILABLE = False
-    PDF_AVAILABLE = True
-    
-    # 在Streamlit Cloud上显示成功信息
-    print("✅ PDF生成依赖库加载成功")
-    
-except ImportError as e:
-    PDF_AVAILABLE = False
-    PIL_AVAILABLE = False
-    
+# 运行环境信息在进程内不会变化，导入时探测一次
+SYSTEM_NAME = platform.system()
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+FONTS_DIR = os.path.join(APP_DIR, 'fonts')
+
+# matplotlib字体缓存固定在应用目录下（用户未自行指定时），容器内HOME不可写时
+# 也不会退回临时目录，进程重启后可直接复用，避免冷启动时重建字体列表
+MPL_CACHE_DIR = os.path.join(APP_DIR, '.mplcache')
+if os.access(APP_DIR, os.W_OK):
+    os.environ.setdefault('MPLCONFIGDIR', MPL_CACHE_DIR)
+
+# 诊断信息统一走logging并使用惰性%格式化，默认只输出警告；设置 LED_DEBUG=1 查看调试日志
+logger = logging.getLogger(__name__)
+if os.environ.get('LED_DEBUG') == '1':
+    logging.basicConfig(format='%(levelname)s %(name)s: %(message)s')
+    logger.setLevel(logging.DEBUG)
+else:
+    logger.setLevel(logging.WARNING)
+
+# 局部重跑片段：Streamlit 1.37+为st.fragment，1.33-1.36为st.experimental_fragment，更早版本退化为整页重跑
+st_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+# PDF相关库较重，仅在生成报告时按需导入；导入时只做轻量的可用性探测
+PDF_REQUIRED_MODULES = ('matplotlib', 'reportlab')
+MISSING_PDF_MODULES = tuple(name for name in PDF_REQUIRED_MODULES if importlib.util.find_spec(name) is None)
+PDF_AVAILABLE = not MISSING_PDF_MODULES
+# PIL用于压缩图表PNG，缺失时直接使用matplotlib输出的原始PNG
+PIL_AVAILABLE = importlib.util.find_spec('PIL') is not None
+
+if not PDF_AVAILABLE:
     # 改进的错误提示，特别针对Streamlit Cloud
-    print(f"⚠️ PDF依赖库加载失败: {str(e)}")
-    print("📝 如果您在本地运行，请执行: pip install matplotlib seaborn reportlab Pillow")
-    print("🌐 如果您在Streamlit Cloud部署，请确保 requirements.txt 包含所有必需依赖库")
+    logger.warning("⚠️ PDF依赖库加载失败，缺少: %s", ", ".join(MISSING_PDF_MODULES))
+    logger.warning("📝 如果您在本地运行，请执行: pip install matplotlib seaborn reportlab Pillow")
+    logger.warning("🌐 如果您在Streamlit Cloud部署，请确保 requirements.txt 包含所有必需依赖库")
     
-    # 创建一个虚拟的streamlit模块用于错误显示
-    import sys
-    if 'streamlit' in sys.modules:
-        try:
-            import streamlit as st_temp
-            st_temp.warning("⚠️ PDF生成功能不可用，将使用简化版HTML报告")
-        except:
-            pass
+    # streamlit已在模块顶部导入，无需再探测运行环境，直接提示即可
+    try:
+        st.warning("⚠️ PDF生成功能不可用，将使用简化版HTML报告")
+    except Exception:
+        pass
 
-def generate_simplified_report(results, df_clean):
-    """生成简化版本的HTML报告（当PDF库不可用时）"""
-    
-    # 获取基本信息
-    basic_info = results.get('basic_info', {})
-    input_params = results.get('input_params', {})
-    calculations = results.get('calculations', {})
-    percentages = results.get('percentages', {})
-    
-    # 当前时间
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # 构建简化的HTML报告
-    html_content = f"""
+# 光谱优化建议规则表：(判定条件, 建议内容)，按顺序逐条判定
+# 建议文本为模块级共享常量，每次分析只追加引用而不重新构造字符串
+OPTIMIZATION_RULES = (
+    (lambda m: m['ppe'] < 2.0, "建议提高PPE：增加光合有效光子输出比例"),
+    (lambda m: m['par_ratio'] < 0.6, "建议优化光谱分布：提高PAR波段(400-700nm)比例"),
+    (lambda m: m['r_b_ratio'] < 0.3, "建议增加红光比例：当前红蓝比过低，可能影响植物伸长和开花"),
+    (lambda m: m['r_b_ratio'] > 4.0, "建议增加蓝光比例：当前红蓝比过高，可能导致徒长"),
+    (lambda m: m['blue_percentage'] < 10, "建议增加蓝光(400-500nm)：促进叶绿素合成和植物紧凑生长"),
+    (lambda m: m['blue_percentage'] > 40, "建议适当减少蓝光：过多蓝光可能抑制植物伸长"),
+    (lambda m: m['green_percentage'] > 20, "建议减少绿光(500-600nm)：绿光利用效率较低"),
+    (lambda m: m['far_red_percentage'] < 2, "建议添加少量远红光(700-800nm)：促进茎伸长和叶片展开"),
+    (lambda m: m['far_red_percentage'] > 15, "建议减少远红光：过多远红光可能导致徒长"),
+    (lambda m: m['uva_percentage'] < 1, "建议添加UV-A(315-400nm)：提高植物抗逆性和次生代谢物含量"),
+    (lambda m: m['heat_loss_rate'] > 0.4, "建议改善散热设计：当前热损失率较高，影响能效"),
+)
+
+DEFAULT_OPTIMIZATION_SUGGESTION = "当前光谱配置较为合理，各项指标均在适宜范围内"
+
+# 光谱分布图的波段文字标注 (起始波长, 截止波长, 标签, PDF图表标记颜色)
+WAVELENGTH_RANGES = (
+    (400, 500, '蓝光', 'blue'),
+    (500, 600, '绿光', 'green'),
+    (600, 700, '红光', 'red'),
+    (700, 800, '远红光', 'maroon')
+)
+# 各标注波段的[起始, 截止)边界，供有序波长数组上的二分查找使用
+WAVELENGTH_RANGE_LIMITS = np.array([(start, end) for start, end, _, _ in WAVELENGTH_RANGES])
+
+# 光学度量体系对比图的重要波长标注 (波长, 标签, 颜色)
+IMPORTANT_WAVELENGTHS = (
+    (430, "蓝光峰值", "#0000FF"),
+    (555, "人眼峰值", "#00FF00"),
+    (630, "红光峰值1", "#FF0000"),
+    (670, "红光峰值2", "#8B0000")
+)
+
+# 光谱点数低于该值时跳过彩虹色谱填充
+FAST_RENDER_MAX_POINTS = 50
+
+# PDF图表PNG分辨率：报告中图片宽度不超过6英寸，150dpi已足够打印
+CHART_DPI = 150
+CHART_SAVE_PARAMS = {
+    'format': 'png',
+    'dpi': CHART_DPI,
+    'bbox_inches': 'tight',
+    'pad_inches': 0.1,
+    'facecolor': 'white',
+    'edgecolor': 'none'
+}
+
+# 运行成本估算使用的电价 (元/kWh)
+ELECTRICITY_RATE = 0.6
+
+# 图表降采样：光谱点数超过阈值时用LTTB降到目标点数（PDF图表与页面Plotly图表共用）
+CHART_DOWNSAMPLE_THRESHOLD = 1500
+CHART_TARGET_POINTS = 1200
+
+# 报告文件名中需要剔除的字符（仅保留字母、数字、下划线、空格和连字符）
+FILENAME_UNSAFE_CHARS = re.compile(r'[^\w \-]+')
+
+# 高密度光谱图的Plotly配置：关闭滚轮缩放与Logo，减少交互开销
+DENSE_PLOT_CONFIG = {'scrollZoom': False, 'displaylogo': False}
+
+# 优化建议优先级关键词（按顺序匹配，未命中任何关键词的归为低优先级）
+SUGGESTION_PRIORITY_PATTERNS = (
+    ("高优先级", re.compile(r"PPE|PAR")),
+    ("中优先级", re.compile(r"红蓝比|热损失")),
+)
+LOW_PRIORITY_LEVEL = "低优先级"
+
+# 光形态指数标签
+MORPHOLOGY_COMPACT = "紧凑型"
+MORPHOLOGY_NORMAL = "正常型"
+MORPHOLOGY_ELONGATED = "徒长型"
+
+# 分级阈值表：阈值升序排列，配合 np.searchsorted 查表得到等级标签
+RATING_LABELS = ("一般", "良好", "优秀")
+RATING_COLORS = ("#dc3545", "#ffc107", "#28a745")
+PPE_RATING_THRESHOLDS = np.array([2.0, 2.5])                # μmol/J，严格大于阈值进入上一级
+PAR_RATING_THRESHOLDS = np.array([0.6, 0.8])
+LIGHT_ENERGY_RATING_THRESHOLDS = np.array([0.3, 0.5])
+LIGHT_ENERGY_RATING_LABELS = ("低效", "中等", "高效")
+SCORE_RATING_THRESHOLDS = np.array([60, 80])                # 评分达到阈值即进入上一级
+QUALITY_SCORE_THRESHOLDS = np.array([6, 8])
+QUALITY_ICONS = ("📈", "👍", "🏆")
+MORPHOLOGY_THRESHOLDS = np.array([0.8, 1.2])                # R/Fr比，严格大于阈值进入上一级
+MORPHOLOGY_LABELS = (MORPHOLOGY_ELONGATED, MORPHOLOGY_NORMAL, MORPHOLOGY_COMPACT)
+# 综合评级中的R/B比得分：(闭阈值, 开阈值, 各档得分)，0.5-3.0得3分，0.3-4.0得2分，其余1分
+RB_QUALITY_RULE = ((0.3, 0.5), (3.0, 4.0), (1, 2, 3, 2, 1))
+
+# PDF报告作物适应性表的推荐应用与生长阶段表的光谱需求说明
+CROP_RECOMMENDATIONS = {
+    '叶菜类': '生菜、菠菜、小白菜、芹菜',
+    '果菜类': '番茄、黄瓜、辣椒、茄子',
+    '育苗专用': '各类蔬菜育苗、花卉育苗'
+}
+GROWTH_STAGE_REQUIREMENTS = {
+    '发芽期': '适量蓝光和红光，促进发芽',
+    '苗期': '高蓝光比例，控制徒长',
+    '营养生长期': '平衡红蓝光，促进叶片发育',
+    '开花期': '高红光比例，促进花芽分化',
+    '结果期': '均衡光谱，高光强需求'
+}
+
+def classify_by_thresholds(value, thresholds, labels, inclusive=False):
+    """按升序阈值查表分级；inclusive为True时等于阈值也进入上一级"""
+    return labels[int(np.searchsorted(thresholds, value, side='right' if inclusive else 'left'))]
+
+# 作物适应性与生长阶段适配性评分规则：{名称: (基础分, ((指标, 闭阈值, 开阈值, 各档得分), ...))}
+# 档位 = 指标达到(>=)的闭阈值个数 + 严格超过(>)的开阈值个数，两组阈值合并后须保持升序
+CROP_SUITABILITY_RULES = {
+    # 叶菜类 (适宜R/B: 0.5-1.5, 高蓝光需求)
+    '叶菜类': (0, (
+        ('r_b_ratio', (0.3, 0.5), (1.5, 2.0), (10, 20, 30, 20, 10)),
+        ('blue_percentage', (), (15, 20), (5, 15, 25)),
+        ('green_percentage', (15,), (), (20, 10)),  # 绿光不宜过多
+        ('par_ratio', (), (0.6, 0.8), (5, 15, 25)),
+    )),
+    # 果菜类 (适宜R/B: 1.0-3.0, 高红光需求)
+    '果菜类': (0, (
+        ('r_b_ratio', (0.7, 1.0), (3.0, 4.0), (10, 20, 30, 20, 10)),
+        ('red_percentage', (), (25, 35), (5, 15, 25)),
+        ('far_red_percentage', (), (5,), (10, 20)),  # 适量远红光促进开花
+        ('par_ratio', (), (0.6, 0.8), (5, 15, 25)),
+    )),
+    # 育苗专用 (高蓝光，适中红光)
+    '育苗专用': (0, (
+        ('r_b_ratio', (0.2, 0.3), (1.0, 1.5), (10, 20, 30, 20, 10)),
+        ('blue_percentage', (), (20, 25), (10, 20, 30)),
+        ('uva_b_ratio', (), (0.1,), (10, 20)),  # UV-A促进育苗
+        ('ppe', (), (2.0,), (10, 20)),
+    )),
+}
+GROWTH_STAGE_RULES = {
+    # 发芽期 (需要适量蓝光和红光)
+    '发芽期': (50, (
+        ('blue_percentage', (15,), (30,), (0, 20, 0)),
+        ('red_percentage', (25,), (45,), (0, 20, 0)),
+        ('ppe', (), (1.8,), (0, 10)),
+    )),
+    # 苗期 (高蓝光，适中红光)
+    '苗期': (50, (
+        ('blue_percentage', (), (25,), (0, 25)),
+        ('r_b_ratio', (0.5,), (1.2,), (0, 20, 0)),
+        ('uva_percentage', (), (2,), (0, 5)),
+    )),
+    # 营养生长期 (平衡红蓝光)
+    '营养生长期': (50, (
+        ('r_b_ratio', (1.0,), (2.0,), (0, 20, 0)),
+        ('par_ratio', (), (0.7,), (0, 15)),
+        ('green_percentage', (10,), (15,), (0, 10, 0)),
+        ('far_red_percentage', (), (3,), (0, 5)),
+    )),
+    # 开花期 (高红光，少量远红光)
+    '开花期': (50, (
+        ('red_percentage', (), (35,), (0, 20)),
+        ('r_b_ratio', (), (2.0,), (0, 15)),
+        ('far_red_percentage', (5,), (12,), (0, 10, 0)),
+        ('r_fr_ratio', (), (2.0,), (0, 5)),
+    )),
+    # 结果期 (均衡光谱，高光强)
+    '结果期': (50, (
+        ('ppe', (), (2.2,), (0, 15)),
+        ('par_ratio', (), (0.8,), (0, 15)),
+        ('r_b_ratio', (1.5,), (3.0,), (0, 15, 0)),
+        ('spectral_completeness', (), (0.6,), (0, 5)),
+    )),
+}
+
+def score_by_thresholds(value, closed_thresholds, open_thresholds, points):
+    """按闭阈值(>=)与开阈值(>)查表得到单项得分"""
+    level = (np.searchsorted(closed_thresholds, value, side='right') +
+             np.searchsorted(open_thresholds, value, side='left'))
+    return points[level]
+
+def score_by_rules(metrics, rules):
+    """按评分规则表累加各指标得分，总分上限为100"""
+    scores = {}
+    for name, (base_score, criteria) in rules.items():
+        score = base_score
+        for metric, closed_thresholds, open_thresholds, points in criteria:
+            score += score_by_thresholds(metrics[metric], closed_thresholds, open_thresholds, points)
+        scores[name] = min(score, 100)
+    return scores
+
+# 光谱波段定义：(波段名称, 起始波长, 终止波长)，均不包括终止波长，积分均使用积分值
+SPECTRAL_BANDS = (
+    ('blue', '蓝光', 400, 500),
+    ('green', '绿光', 500, 600),
+    ('red', '红光', 600, 700),
+    ('far_red', '远红光', 700, 800),
+    ('uva', 'UV-A', 315, 400),      # 光形态建成相关
+    ('uvb', 'UV-B', 280, 315),
+    ('violet', '紫光', 380, 420),
+    ('nir', '近红外', 700, 850),
+)
+
+# 各波段的[下限, 上限)波长边界，供有序波长数组上的二分查找使用
+SPECTRAL_BAND_LIMITS = np.array([(min_wave, max_wave) for _, _, min_wave, max_wave in SPECTRAL_BANDS])
+# PAR波段[400, 700) nm
+PAR_RANGE = (400, 700)
+
+# 波段积分数组的索引（与SPECTRAL_BANDS顺序一致）
+BAND_INDEX = {key: i for i, (key, _, _, _) in enumerate(SPECTRAL_BANDS)}
+# 光质总和包含的波段：蓝、绿、红、远红
+LIGHT_QUALITY_BANDS = np.array([BAND_INDEX[key] for key in ('blue', 'green', 'red', 'far_red')])
+# 扩展光质总和包含的波段：除UV-B外的全部波段
+EXTENDED_QUALITY_BANDS = np.array([i for key, i in BAND_INDEX.items() if key != 'uvb'])
+
+def plant_photosynthetic_response(wavelengths):
+    """McCree (1972) 植物光合敏感曲线P(λ)，支持数组输入，400-700nm以外为0"""
+    w = np.asarray(wavelengths, dtype=float)
+    # 蓝光区域峰值在430nm附近
+    blue_response = np.exp(-0.5 * ((w - 430) / 40) ** 2) * 0.8 + \
+                    np.exp(-0.5 * ((w - 470) / 30) ** 2) * 0.6
+    # 红光区域峰值在630-680nm附近
+    red_response = np.exp(-0.5 * ((w - 630) / 35) ** 2) * 0.9 + \
+                   np.exp(-0.5 * ((w - 670) / 25) ** 2) * 0.7
+    return np.select([(w < 400) | (w > 700), w <= 550], [0.0, blue_response], default=red_response)
+
+def wavelength_to_rgb(wavelengths):
+    """将波长转换为RGB颜色值 (基于可见光谱)，支持数组输入，返回形状为(..., 3)的数组"""
+    w = np.asarray(wavelengths, dtype=float)
+    conditions = [
+        w < 380,  # 紫外线区域显示为紫色
+        w < 440,  # 紫到蓝
+        w < 490,  # 蓝到青
+        w < 510,  # 青到绿
+        w < 580,  # 绿到黄
+        w < 645,  # 黄到橙
+        w < 750   # 橙到红
+    ]
+    # 红外线区域（默认分支）显示为深红
+    red = np.select(conditions, [0.5, 0.5 - 0.5 * (w - 380) / 60, 0.0, 0.0, (w - 510) / 70, 1.0, 1.0], default=0.5)
+    green = np.select(conditions, [0.0, 0.0, (w - 440) / 50, 1.0, 1.0, 1.0 - 0.5 * (w - 580) / 65, 0.5 - 0.5 * (w - 645) / 105], default=0.0)
+    blue = np.select(conditions, [1.0, 1.0, 1.0, 1.0 - (w - 490) / 20, 0.0, 0.0, 0.0], default=0.0)
+    # 限定在[0, 1]内，保证可直接用作matplotlib颜色或乘255转换为8位整数
+    return np.clip(np.stack([red, green, blue], axis=-1), 0.0, 1.0)
+
+# 不同作物的典型光饱和点 (μmol/m²/s)
+CROP_SATURATION_TYPES = ('叶菜类', '果菜类', '花卉类', '草本类')
+CROP_SATURATION_POINTS = np.array([300.0, 800.0, 400.0, 200.0])
+
+# 模板占位符的缺省值，结果中缺少对应字段时使用
+SIMPLIFIED_REPORT_DEFAULTS = {
+    'lamp_model': '未填写',
+    'manufacturer': '未填写',
+    'test_date': '未填写',
+    'total_radiation_flux': 0,
+    'total_power': 0,
+    'back_panel_temp': 0,
+    'power_factor': 0,
+    'ppe': 0,
+    'par_ratio': 0,
+    'r_b_ratio': 0,
+    'light_energy_ratio': 0,
+    'blue_integration': 0,
+    'green_integration': 0,
+    'red_integration': 0,
+    'far_red_integration': 0,
+    'blue_percentage': 0,
+    'green_percentage': 0,
+    'red_percentage': 0,
+    'far_red_percentage': 0,
+    'optimization_suggestions': []
+}
+
+# 页面自定义CSS样式，在导入时定义一次
+CUSTOM_CSS = """
+    <style>
+    .main-header {
+        font-size: 2.5rem;
+        font-weight: bold;
+        text-align: center;
+        background: linear-gradient(90deg, #FF6B6B, #4ECDC4, #45B7D1);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        margin-bottom: 2rem;
+    }
+    .theory-box {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 1.5rem;
+        border-radius: 10px;
+        color: white;
+        margin: 1rem 0;
+    }
+    .metric-card {
+        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+        padding: 1rem;
+        border-radius: 8px;
+        margin: 0.5rem 0;
+    }
+    </style>
+    """
+
+# 结果页渐变信息卡片模板，在导入时定义一次，显示时用format填充
+GRADIENT_CARD_TEMPLATE = """
+<div style='background: linear-gradient(135deg, {start_color} 0%, {end_color} 100%); 
+            padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
+    <{title_tag}>{title}</{title_tag}>
+    <{value_tag}>{value}</{value_tag}>
+</div>
+"""
+
+# 简化版HTML报告模板：页眉部分在导入时定义一次，生成报告时用format_map填充
+SIMPLIFIED_REPORT_HEADER = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -90,44 +391,40 @@ def generate_simplified_report(results, df_clean):
         <h2>📋 测试基本信息</h2>
         <table>
             <tr><th>项目</th><th>数值</th></tr>
-            <tr><td>灯具型号</td><td>{basic_info.get('lamp_model', '未填写')}</td></tr>
-            <tr><td>制造商/单位</td><td>{basic_info.get('manufacturer', '未填写')}</td></tr>
-            <tr><td>测试日期</td><td>{basic_info.get('test_date', '未填写')}</td></tr>
-            <tr><td>总辐射通量</td><td>{input_params.get('total_radiation_flux', 0):.1f} W</td></tr>
-            <tr><td>总功率</td><td>{input_params.get('total_power', 0):.1f} W</td></tr>
-            <tr><td>后面板温度</td><td>{input_params.get('back_panel_temp', 0):.1f} ℃</td></tr>
-            <tr><td>功率因数</td><td>{input_params.get('power_factor', 0):.3f}</td></tr>
+            <tr><td>灯具型号</td><td>{lamp_model}</td></tr>
+            <tr><td>制造商/单位</td><td>{manufacturer}</td></tr>
+            <tr><td>测试日期</td><td>{test_date}</td></tr>
+            <tr><td>总辐射通量</td><td>{total_radiation_flux:.1f} W</td></tr>
+            <tr><td>总功率</td><td>{total_power:.1f} W</td></tr>
+            <tr><td>后面板温度</td><td>{back_panel_temp:.1f} ℃</td></tr>
+            <tr><td>功率因数</td><td>{power_factor:.3f}</td></tr>
         </table>
         
         <h2>🏆 综合评价</h2>
         <div class="highlight">
-            <p><strong>总体评级：</strong>{calculations.get('quality_rating', '未知')} {calculations.get('quality_icon', '')}</p>
+            <p><strong>总体评级：</strong>{quality_rating} {quality_icon}</p>
             <ul>
-                <li><strong>PPE (光合光子效率)：</strong>{calculations.get('ppe', 0):.3f} μmol/J</li>
-                <li><strong>PAR占比：</strong>{calculations.get('par_ratio', 0)*100:.1f}%</li>
-                <li><strong>R/B比：</strong>{calculations.get('r_b_ratio', 0):.2f}</li>
-                <li><strong>光能比：</strong>{calculations.get('light_energy_ratio', 0):.3f}</li>
+                <li><strong>PPE (光合光子效率)：</strong>{ppe:.3f} μmol/J</li>
+                <li><strong>PAR占比：</strong>{par_percentage:.1f}%</li>
+                <li><strong>R/B比：</strong>{r_b_ratio:.2f}</li>
+                <li><strong>光能比：</strong>{light_energy_ratio:.3f}</li>
             </ul>
         </div>
         
         <h2>🌈 光谱分布数据</h2>
         <table>
             <tr><th>光谱波段</th><th>波长范围</th><th>积分值</th><th>占比</th></tr>
-            <tr><td>蓝光</td><td>400-500 nm</td><td>{calculations.get('blue_integration', 0):.2f}</td><td>{percentages.get('blue_percentage', 0):.1f}%</td></tr>
-            <tr><td>绿光</td><td>500-600 nm</td><td>{calculations.get('green_integration', 0):.2f}</td><td>{percentages.get('green_percentage', 0):.1f}%</td></tr>
-            <tr><td>红光</td><td>600-700 nm</td><td>{calculations.get('red_integration', 0):.2f}</td><td>{percentages.get('red_percentage', 0):.1f}%</td></tr>
-            <tr><td>远红光</td><td>700-800 nm</td><td>{calculations.get('far_red_integration', 0):.2f}</td><td>{percentages.get('far_red_percentage', 0):.1f}%</td></tr>
+            <tr><td>蓝光</td><td>400-500 nm</td><td>{blue_integration:.2f}</td><td>{blue_percentage:.1f}%</td></tr>
+            <tr><td>绿光</td><td>500-600 nm</td><td>{green_integration:.2f}</td><td>{green_percentage:.1f}%</td></tr>
+            <tr><td>红光</td><td>600-700 nm</td><td>{red_integration:.2f}</td><td>{red_percentage:.1f}%</td></tr>
+            <tr><td>远红光</td><td>700-800 nm</td><td>{far_red_integration:.2f}</td><td>{far_red_percentage:.1f}%</td></tr>
         </table>
         
         <h2>💡 光谱优化建议</h2>
         <ul>
-    """
-    
-    suggestions = calculations.get('optimization_suggestions', [])
-    for suggestion in suggestions:
-        html_content += f"<li>{suggestion}</li>"
-    
-    html_content += """
+"""
+
+SIMPLIFIED_REPORT_FOOTER = """
         </ul>
         
         <h2>📖 分析方法说明</h2>
@@ -143,208 +440,238 @@ def generate_simplified_report(results, df_clean):
         </footer>
     </body>
     </html>
-    """
+"""
+
+def generate_simplified_report(results, df_clean):
+    """生成简化版本的HTML报告（当PDF库不可用时）"""
+    
+    # 获取基本信息
+    basic_info = results.get('basic_info', {})
+    input_params = results.get('input_params', {})
+    calculations = results.get('calculations', {})
+    percentages = results.get('percentages', {})
+    display_fields = format_display_fields(results)
+    
+    # 当前时间
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    # 构建简化的HTML报告
+    report_context = {
+        **SIMPLIFIED_REPORT_DEFAULTS,
+        **basic_info,
+        **input_params,
+        **calculations,
+        **percentages,
+        **display_fields,
+        'current_time': current_time
+    }
+    report_context['par_percentage'] = report_context['par_ratio'] * 100
+    
+    # 各片段收集到列表中最后一次性拼接，避免字符串反复累加
+    parts = [SIMPLIFIED_REPORT_HEADER.format_map(report_context)]
+    parts.extend(f"<li>{suggestion}</li>" for suggestion in report_context['optimization_suggestions'])
+    parts.append(SIMPLIFIED_REPORT_FOOTER)
     
-    return html_content.encode('utf-8')
+    return "".join(parts).encode('utf-8')
 
-def generate_chart_images(results, df_clean):
-    """生成图表图片用于PDF报告"""
-    chart_images = {}
+def lttb_downsample(x, y, n_out):
+    """使用LTTB (Largest-Triangle-Three-Buckets) 算法将按x升序排列的曲线降采样到n_out个点，保留峰谷形状"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    
+    # 首尾点固定保留，中间点均分为n_out-2个桶，每桶选出与相邻点构成三角形面积最大的点
+    bucket_edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = bucket_edges[i], bucket_edges[i + 1]
+        next_end = bucket_edges[i + 2] if i + 2 < len(bucket_edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        area = np.abs((x[prev] - avg_x) * (y[start:end] - y[prev]) -
+                      (x[prev] - x[start:end]) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+    
+    return x[selected], y[selected]
+
+@st.cache_resource(show_spinner=False)
+def configure_chinese_fonts():
+    """配置matplotlib中文字体支持，字体探测与验证每个进程只执行一次，返回首选字体名"""
+    import matplotlib
+    # 服务器端仅需非交互式后端，在导入pyplot之前固定一次
+    matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+    import matplotlib.font_manager as fm
     
-    # 验证输入数据
-    if not results or not isinstance(results, dict):
-        raise ValueError("分析结果数据不完整，无法生成图表")
+    # 首先尝试加载项目中的中文字体
+    noto_font_path = os.path.join(FONTS_DIR, 'NotoSansSC-Regular.ttf')
     
-    if df_clean is None or df_clean.empty:
-        raise ValueError("光谱数据为空，无法生成图表")
+    # 备选字体列表
+    fallback_fonts = []
     
-    # 获取必要的数据
-    calculations = results.get('calculations', {})
-    percentages = results.get('percentages', {})
+    # 系统字体路径
+    if SYSTEM_NAME == "Windows":
+        fallback_fonts = ['SimHei', 'Microsoft YaHei', 'SimSun']
+    elif SYSTEM_NAME == "Darwin":  # macOS
+        fallback_fonts = ['STHeiti', 'PingFang SC', 'Arial Unicode MS']
+    else:  # Linux
+        fallback_fonts = ['WenQuanYi Micro Hei', 'Noto Sans CJK SC', 'DejaVu Sans']
     
-    print(f"图表生成数据验证：")
-    print(f"- 光谱数据点数: {len(df_clean)}")
-    print(f"- 计算结果数量: {len(calculations)}")
-    print(f"- 百分比数据数量: {len(percentages)}")
+    # 首先尝试NotoSansSC字体
+    if os.path.exists(noto_font_path):
+        try:
+            # 直接注册到内存中的字体列表，当前进程即可按名称使用，无需重建字体缓存
+            fm.fontManager.addfont(noto_font_path)
+            # 获取字体的实际名称
+            font_name = fm.FontProperties(fname=noto_font_path).get_name()
+            logger.debug("✅ 找到本地字体: %s", noto_font_path)
+            
+            # 添加到字体列表开头
+            fallback_fonts.insert(0, font_name)
+        except Exception as e:
+            logger.warning("⚠️ 加载本地字体失败: %s", e)
+    
+    # 一次性建立已安装字体名集合，只保留实际可用的备选字体，避免逐个名称回退查找
+    installed_fonts = {font.name for font in fm.fontManager.ttflist}
+    fallback_fonts = [name for name in fallback_fonts if name in installed_fonts]
+    
+    # 重置为默认样式（不影响已选定的后端），再一次性写入字体相关配置
+    plt.style.use('default')
+    plt.rcParams.update({
+        'axes.unicode_minus': False,  # 解决负号显示问题
+        'font.family': ['sans-serif'],  # 强制设置字体支持
+        'font.sans-serif': fallback_fonts + ['Arial', 'Helvetica', 'sans-serif']
+    })
+    logger.debug("📋 字体配置: %s", plt.rcParams['font.sans-serif'])
+    
+    # 验证字体设置（仅用于调试日志）：直接查询字体管理器的解析结果（带缓存），无需创建测试图表
+    if logger.isEnabledFor(logging.DEBUG):
+        used_font_path = fm.findfont(fm.FontProperties(family=plt.rcParams['font.sans-serif'][0]))
+        logger.debug("✅ 实际使用的字体: %s", fm.FontProperties(fname=used_font_path).get_name())
+    
+    return plt.rcParams['font.sans-serif'][0]
+
+def fit_chart_size(png_bytes, max_width, max_height):
+    """按PNG头部(IHDR)记录的像素尺寸，计算在最大宽高内保持长宽比的显示尺寸，无需解码图片"""
+    if png_bytes[:8] != b'\x89PNG\r\n\x1a\n' or png_bytes[12:16] != b'IHDR':
+        raise ValueError("图表不是有效的PNG图片")
+    pixel_width, pixel_height = struct.unpack('>II', png_bytes[16:24])
+    scale = min(max_width / pixel_width, max_height / pixel_height)
+    return pixel_width * scale, pixel_height * scale
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def render_chart_images(wavelengths, radiations, percentages, crop_suitability):
+    """渲染PDF报告图表并返回PNG字节串，仅以绘图用到的数据为缓存键"""
+    # 首先确保导入必需的库
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import PolyCollection
+    import matplotlib.font_manager as fm
+    import numpy as np
+    
+    # 配置中文字体，字体属性只解析一次，各图表文字共用（Text会复制传入的属性对象）
+    chart_font = fm.FontProperties(family=configure_chinese_fonts())
+    
+    # 光谱数据准备（在主线程中完成校验与排序）
+    if len(wavelengths) == 0 or len(radiations) == 0:
+        raise ValueError("光谱数据为空")
     
-    try:
-        # 首先确保导入必需的库
-        from matplotlib import pyplot as plt
-        import matplotlib.font_manager as fm
-        import platform
-        import os
-        import numpy as np
-        
-        # 创建matplotlib字体配置函数
-        def configure_chinese_fonts():
-            """配置matplotlib中文字体支持"""
-            # 重置字体配置
-            plt.rcParams.update(plt.rcParamsDefault)
-            plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
-            
-            # 强制设置字体支持
-            plt.rcParams['font.family'] = ['sans-serif']
-            
-            # 首先尝试加载项目中的中文字体
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            fonts_dir = os.path.join(base_dir, 'fonts')
-            noto_font_path = os.path.join(fonts_dir, 'NotoSansSC-Regular.ttf')
-            
-            # 备选字体列表
-            fallback_fonts = []
-            
-            # 系统字体路径
-            system = platform.system()
-            if system == "Windows":
-                fallback_fonts = ['SimHei', 'Microsoft YaHei', 'SimSun']
-            elif system == "Darwin":  # macOS
-                fallback_fonts = ['STHeiti', 'PingFang SC', 'Arial Unicode MS']
-            else:  # Linux
-                fallback_fonts = ['WenQuanYi Micro Hei', 'Noto Sans CJK SC', 'DejaVu Sans']
-            
-            # 首先尝试NotoSansSC字体
-            if os.path.exists(noto_font_path):
-                try:
-                    # 直接注册字体
-                    font_prop = fm.FontProperties(fname=noto_font_path)
-                    # 获取字体的实际名称
-                    font_name = font_prop.get_name()
-                    print(f"✅ 找到本地字体: {noto_font_path}")
-                    
-                    # 添加到字体列表开头
-                    fallback_fonts.insert(0, font_name)
-                except Exception as e:
-                    print(f"⚠️ 加载本地字体失败: {str(e)}")
-            
-            # 设置字体列表
-            plt.rcParams['font.sans-serif'] = fallback_fonts + ['Arial', 'Helvetica', 'sans-serif']
-            print(f"📋 字体配置: {plt.rcParams['font.sans-serif']}")
-            
-            # 验证字体设置
-            fig, ax = plt.subplots(figsize=(1, 1))
-            test_text = ax.text(0.5, 0.5, '测试中文字体', ha='center', va='center')
-            used_font = test_text.get_fontproperties().get_name()
-            plt.close(fig)
-            print(f"✅ 实际使用的字体: {used_font}")
-            
-            return plt.rcParams['font.sans-serif'][0]
-        
-        # 配置中文字体
-        primary_font = configure_chinese_fonts()
-        
-        # 1. 光谱分布图（彩虹图谱）
-        fig, ax = plt.subplots(figsize=(12, 6))
-        wavelengths = df_clean['wavelength'].values
-        radiations = df_clean['radiation'].values
-        
-        # 验证光谱数据
-        if len(wavelengths) == 0 or len(radiations) == 0:
-            raise ValueError("光谱数据为空")
-        
-        print(f"光谱图数据：波长范围 {wavelengths.min():.1f}-{wavelengths.max():.1f} nm，{len(wavelengths)} 个数据点")
-        
-        # 创建彩虹色谱效果
-        def wavelength_to_rgb(wavelength):
-            """将波长转换为RGB颜色值 (基于可见光谱)"""
-            if wavelength < 380:
-                return (0.5, 0.0, 1.0)  # 紫外线区域显示为紫色
-            elif wavelength < 440:
-                # 紫到蓝
-                t = (wavelength - 380) / (440 - 380)
-                return (0.5 - 0.5*t, 0.0, 1.0)
-            elif wavelength < 490:
-                # 蓝到青
-                t = (wavelength - 440) / (490 - 440)
-                return (0.0, t, 1.0)
-            elif wavelength < 510:
-                # 青到绿
-                t = (wavelength - 490) / (510 - 490)
-                return (0.0, 1.0, 1.0 - t)
-            elif wavelength < 580:
-                # 绿到黄
-                t = (wavelength - 510) / (580 - 510)
-                return (t, 1.0, 0.0)
-            elif wavelength < 645:
-                # 黄到橙
-                t = (wavelength - 580) / (645 - 580)
-                return (1.0, 1.0 - 0.5*t, 0.0)
-            elif wavelength < 750:
-                # 橙到红
-                t = (wavelength - 645) / (750 - 645)
-                return (1.0, 0.5 - 0.5*t, 0.0)
-            else:
-                # 红外线区域显示为深红
-                return (0.5, 0.0, 0.0)
-        
-        # 创建连续的彩虹填充效果
-        step = 5  # 每5nm一个颜色段
-        min_wave = int(wavelengths.min())
-        max_wave = int(wavelengths.max())
+    # 按波长排序一次，之后的填充与波段标注都基于有序数组
+    order = np.argsort(wavelengths, kind='stable')
+    wavelengths = wavelengths[order]
+    radiations = radiations[order]
+    
+    logger.debug("光谱图数据：波长范围 %.1f-%.1f nm，%d 个数据点", wavelengths[0], wavelengths[-1], len(wavelengths))
+    
+    # 高分辨率光谱按图片分辨率降采样，仅影响绘图，数值计算仍使用完整数据
+    plot_waves, plot_rads = wavelengths, radiations
+    if len(plot_waves) > CHART_DOWNSAMPLE_THRESHOLD:
+        plot_waves, plot_rads = lttb_downsample(plot_waves, plot_rads, CHART_TARGET_POINTS)
+    
+    def save_chart(fig):
+        """将图表保存为PNG字节串"""
+        img_buffer = io.BytesIO()
+        fig.savefig(img_buffer, **CHART_SAVE_PARAMS)
+        if not PIL_AVAILABLE:
+            return img_buffer.getvalue()
         
-        # 按小段创建填充，每段使用对应的光谱颜色
-        for wave_start in range(min_wave, max_wave, step):
-            wave_end = min(wave_start + step, max_wave)
-            
-            # 筛选该波长范围内的数据
-            mask = (wavelengths >= wave_start) & (wavelengths < wave_end)
-            if np.any(mask):
-                range_waves = wavelengths[mask]
-                range_rads = radiations[mask]
-                
-                if len(range_waves) > 0:
-                    # 计算该范围的中心波长用于颜色映射
-                    center_wave = (wave_start + wave_end) / 2
-                    r, g, b = wavelength_to_rgb(center_wave)
-                    color = f'rgba({int(r*255)}, {int(g*255)}, {int(b*255)}, 0.8)'
-                    
-                    # 创建填充区域
-                    ax.fill_between(range_waves, range_rads, alpha=0.8, color=(r, g, b))
+        # 图表颜色有限，转为256色调色板并优化压缩，显著减小嵌入PDF的图片体积
+        from PIL import Image as PILImage
+        img_buffer.seek(0)
+        # 图表固定为matplotlib输出的PNG，只让PNG解码器识别，避免逐个探测其他格式插件
+        with PILImage.open(img_buffer, formats=('PNG',)) as img:
+            palette_img = img.convert('RGB').quantize(colors=256, method=PILImage.Quantize.FASTOCTREE)
+        optimized_buffer = io.BytesIO()
+        palette_img.save(optimized_buffer, format='PNG', optimize=True)
+        return optimized_buffer.getvalue()
+    
+    def render_spectrum_chart():
+        """1. 光谱分布图（彩虹图谱）"""
+        fig = Figure(figsize=(12, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        
+        # 创建连续的彩虹填充效果：相邻采样点之间各构成一个四边形，
+        # 全部四边形放入一个PolyCollection，一次性添加到坐标轴
+        if len(plot_waves) > 1:
+            left_waves, right_waves = plot_waves[:-1], plot_waves[1:]
+            left_rads, right_rads = plot_rads[:-1], plot_rads[1:]
+            zeros = np.zeros_like(left_waves)
+            quads = np.stack([
+                np.column_stack([left_waves, zeros]),
+                np.column_stack([left_waves, left_rads]),
+                np.column_stack([right_waves, right_rads]),
+                np.column_stack([right_waves, zeros])
+            ], axis=1)
+            # 每个四边形按其中心波长着色
+            quad_colors = wavelength_to_rgb((left_waves + right_waves) / 2)
+            ax.add_collection(PolyCollection(quads, facecolors=quad_colors, edgecolors='none', antialiaseds=False, alpha=0.8))
         
         # 添加整体光谱线条作为轮廓
-        ax.plot(wavelengths, radiations, color='black', linewidth=1.5, alpha=0.7)
+        ax.plot(plot_waves, plot_rads, color='black', linewidth=1.5, alpha=0.7)
         
         # 设置坐标轴和标题 - 显式指定字体
-        ax.set_xlabel('波长 (nm)', fontsize=12, fontweight='bold', fontproperties=fm.FontProperties(family=primary_font))
-        ax.set_ylabel('辐射强度', fontsize=12, fontweight='bold', fontproperties=fm.FontProperties(family=primary_font))
-        ax.set_title('LED光谱分布图 (彩虹色谱)', fontsize=14, fontweight='bold', fontproperties=fm.FontProperties(family=primary_font))
+        ax.set_xlabel('波长 (nm)', fontsize=12, fontweight='bold', fontproperties=chart_font)
+        ax.set_ylabel('辐射强度', fontsize=12, fontweight='bold', fontproperties=chart_font)
+        ax.set_title('LED光谱分布图 (彩虹色谱)', fontsize=14, fontweight='bold', fontproperties=chart_font)
         ax.grid(True, alpha=0.3)
         
         # 添加波段标记
-        bands = [(400, 500, '蓝光'), (500, 600, '绿光'), (600, 700, '红光'), (700, 800, '远红光')]
-        band_colors = ['blue', 'green', 'red', 'maroon']
+        band_edges = np.searchsorted(wavelengths, WAVELENGTH_RANGE_LIMITS, side='left')
         
-        for i, (start, end, label) in enumerate(bands):
-            mask = (wavelengths >= start) & (wavelengths < end)
-            if np.any(mask):
+        for (start, end, label, band_color), (start_idx, end_idx) in zip(WAVELENGTH_RANGES, band_edges):
+            if end_idx > start_idx:
                 center = (start + end) / 2
-                max_y = radiations[mask].max() if len(radiations[mask]) > 0 else radiations.max() * 0.8
+                max_y = radiations[start_idx:end_idx].max()
                 # 添加半透明的波段标记
-                ax.axvspan(start, end, alpha=0.1, color=band_colors[i])
+                ax.axvspan(start, end, alpha=0.1, color=band_color)
                 ax.text(center, max_y * 1.1, label, ha='center', va='bottom', 
                        fontsize=11, fontweight='bold',
-                       fontproperties=fm.FontProperties(family=primary_font),
-                       bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8, edgecolor=band_colors[i]))
-        
-        plt.tight_layout()
+                       fontproperties=chart_font,
+                       bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8, edgecolor=band_color))
         
-        # 保存为字节流
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight', 
-                   facecolor='white', edgecolor='none')
-        img_buffer.seek(0)
-        chart_images['spectrum'] = img_buffer
-        plt.close()
-        print("✅ 彩虹光谱分布图生成完成")
+        fig.tight_layout()
         
-        # 2. 光质分布饼图
-        fig, ax = plt.subplots(figsize=(10, 8))
-        percentages = results.get('percentages', {})
+        logger.debug("✅ 彩虹光谱分布图生成完成")
+        return save_chart(fig)
+    
+    def render_pie_chart():
+        """2. 光质分布饼图"""
+        fig = Figure(figsize=(10, 8))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
         
         # 验证百分比数据
         required_percentages = ['blue_percentage', 'green_percentage', 'red_percentage', 'far_red_percentage']
         missing_data = [key for key in required_percentages if key not in percentages]
         if missing_data:
-            print(f"警告：缺少百分比数据 {missing_data}")
+            logger.warning("警告：缺少百分比数据 %s", missing_data)
         
         labels = ['蓝光\n(400-500nm)', '绿光\n(500-600nm)', '红光\n(600-700nm)', '远红光\n(700-800nm)']
         sizes = [
@@ -354,154 +681,147 @@ def generate_chart_images(results, df_clean):
             percentages.get('far_red_percentage', 0)
         ]
         
-        print(f"饼图数据：蓝光{sizes[0]:.1f}%, 绿光{sizes[1]:.1f}%, 红光{sizes[2]:.1f}%, 远红光{sizes[3]:.1f}%")
-        
-        colors_pie = ['#4285F4', '#34A853', '#EA4335', '#FB04DA']
-        
-        # 创建文字属性字典，显式指定字体
-        text_props = {'fontsize': 11, 'fontweight': 'bold', 'fontproperties': fm.FontProperties(family=primary_font)}
-        
-        wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors_pie, autopct='%1.1f%%',
-                                         startangle=90, textprops=text_props)
+        logger.debug("饼图数据：蓝光%.1f%%, 绿光%.1f%%, 红光%.1f%%, 远红光%.1f%%", *sizes[:4])
         
-        # 确保饼图标签使用正确字体
-        for text in texts:
-            text.set_fontweight('bold')
-            text.set_fontproperties(fm.FontProperties(family=primary_font))
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-            autotext.set_fontsize(10)
-            # 百分比文本也需要设置字体
-            autotext.set_fontproperties(fm.FontProperties(family=primary_font))
+        # 四个波段占比全为0时无法绘制饼图，与雷达图一致改为显示提示文字
+        if sum(sizes) > 0:
+            colors_pie = ['#4285F4', '#34A853', '#EA4335', '#FB04DA']
             
-        ax.set_title('光质分布占比', fontsize=16, fontweight='bold', pad=20, 
-                   fontproperties=fm.FontProperties(family=primary_font))
+            # 创建文字属性字典，显式指定字体
+            text_props = {'fontsize': 11, 'fontweight': 'bold', 'fontproperties': chart_font}
+            
+            wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors_pie, autopct='%1.1f%%',
+                                             startangle=90, textprops=text_props)
+            
+            # 确保饼图标签使用正确字体
+            for text in texts:
+                text.set_fontweight('bold')
+                text.set_fontproperties(chart_font)
+            for autotext in autotexts:
+                autotext.set_color('white')
+                autotext.set_fontweight('bold')
+                autotext.set_fontsize(10)
+                # 百分比文本也需要设置字体
+                autotext.set_fontproperties(chart_font)
+        else:
+            logger.warning("光质占比全部为0，跳过饼图绘制")
+            ax.text(0.5, 0.5, '无光质分布数据', transform=ax.transAxes,
+                   ha='center', va='center', fontsize=14,
+                   fontproperties=chart_font)
+            ax.axis('off')
         
-        plt.tight_layout()
+        ax.set_title('光质分布占比', fontsize=16, fontweight='bold', pad=20, 
+                   fontproperties=chart_font)
         
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight',
-                   facecolor='white', edgecolor='none')
-        img_buffer.seek(0)
-        chart_images['pie'] = img_buffer
-        plt.close()
-        print("✅ 光质分布饼图生成完成")
+        fig.tight_layout()
         
-        # 3. 作物适应性雷达图
-        fig, ax = plt.subplots(figsize=(10, 8), subplot_kw=dict(projection='polar'))
+        logger.debug("✅ 光质分布饼图生成完成")
+        return save_chart(fig)
+    
+    def render_radar_chart():
+        """3. 作物适应性雷达图"""
+        fig = Figure(figsize=(10, 8))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(projection='polar')
         
-        crop_suitability = results.get('calculations', {}).get('crop_suitability', {})
         categories = list(crop_suitability.keys())
-        values = list(crop_suitability.values())
         
-        print(f"雷达图数据：{len(categories)} 个作物类型")
-        for cat, val in zip(categories, values):
-            print(f"  {cat}: {val}分")
+        logger.debug("雷达图数据：%d 个作物类型 %s", len(categories), crop_suitability)
         
-        if categories and values:
-            # 闭合雷达图
-            angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-            values += values[:1]  # 闭合
-            angles += angles[:1]  # 闭合
-            
-            ax.plot(angles, values, 'o-', linewidth=3, color='#4285F4', markersize=8)
-            ax.fill(angles, values, alpha=0.25, color='#4285F4')
-            ax.set_xticks(angles[:-1])
+        if categories:
+            # 闭合雷达图：首点追加到末尾，直接构造为数组
+            angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False)
+            values = np.fromiter(crop_suitability.values(), dtype=float, count=len(categories))
+            closed_angles = np.r_[angles, angles[:1]]
+            closed_values = np.r_[values, values[:1]]
+        
+            ax.plot(closed_angles, closed_values, 'o-', linewidth=3, color='#4285F4', markersize=8)
+            ax.fill(closed_angles, closed_values, alpha=0.25, color='#4285F4')
+            ax.set_xticks(angles)
             # 显式设置所有标签的字体
             ax.set_xticklabels(categories, fontsize=12, fontweight='bold', 
-                             fontproperties=fm.FontProperties(family=primary_font))
+                             fontproperties=chart_font)
             ax.set_ylim(0, 100)
             ax.set_yticks([20, 40, 60, 80, 100])
             ax.set_yticklabels(['20', '40', '60', '80', '100'], fontsize=10, fontweight='bold',
-                             fontproperties=fm.FontProperties(family=primary_font))
+                             fontproperties=chart_font)
             ax.set_title('作物适应性评价', fontsize=16, fontweight='bold', pad=30, 
-                       fontproperties=fm.FontProperties(family=primary_font))
+                       fontproperties=chart_font)
             ax.grid(True, alpha=0.6)
-            
+        
             # 设置网格线样式
             ax.grid(True, linestyle='--', alpha=0.7)
         else:
             ax.text(0.5, 0.5, '无作物适应性数据', transform=ax.transAxes, 
                    ha='center', va='center', fontsize=14,
-                   fontproperties=fm.FontProperties(family=primary_font))
-        
-        plt.tight_layout()
-        
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight',
-                   facecolor='white', edgecolor='none')
-        img_buffer.seek(0)
-        chart_images['radar'] = img_buffer
-        plt.close()
-        print("✅ 作物适应性雷达图生成完成")
-        
-        print(f"\n🎯 所有图表生成完成，共生成 {len(chart_images)} 个图表文件")
+                   fontproperties=chart_font)
         
-    except Exception as e:
-        st.error(f"生成图表时出错: {str(e)}")
-        # 如果生成图表失败，返回空字典
-        chart_images = {}
+        fig.tight_layout()
         
-        # 尝试清理可能存在的图形对象
-        try:
-            import matplotlib.pyplot as plt
-            plt.close('all')  # 关闭所有可能打开的图形
-        except:
-            pass
+        logger.debug("✅ 作物适应性雷达图生成完成")
+        return save_chart(fig)
+    
+    # 每个图表使用独立的Figure与Agg画布（不经过非线程安全的pyplot），
+    # 栅格化和PNG压缩在C代码中释放GIL，多个图表可并行渲染
+    chart_builders = {
+        'spectrum': render_spectrum_chart,
+        'pie': render_pie_chart,
+        'radar': render_radar_chart
+    }
+    with ThreadPoolExecutor(max_workers=len(chart_builders)) as executor:
+        futures = {name: executor.submit(builder) for name, builder in chart_builders.items()}
+        chart_images = {name: future.result() for name, future in futures.items()}
     
+    logger.debug("🎯 所有图表生成完成，共生成 %d 个图表文件", len(chart_images))
     return chart_images
 
-def generate_pdf_report(results, df_clean):
-    """生成PDF格式的分析报告"""
-    
-    # 验证输入数据的完整性
+def generate_chart_images(results, df_clean):
+    """生成图表图片用于PDF报告，返回 {图表名: PNG字节串}"""
+    # 验证输入数据
     if not results or not isinstance(results, dict):
-        raise ValueError("分析结果数据不完整，无法生成PDF报告")
+        raise ValueError("分析结果数据不完整，无法生成图表")
     
     if df_clean is None or df_clean.empty:
-        raise ValueError("光谱数据不完整，无法生成PDF报告")
+        raise ValueError("光谱数据为空，无法生成图表")
     
-    # 验证核心数据是否存在
+    # 获取必要的数据
     calculations = results.get('calculations', {})
     percentages = results.get('percentages', {})
-    basic_info = results.get('basic_info', {})
-    input_params = results.get('input_params', {})
-    
-    if not calculations:
-        raise ValueError("计算结果为空，无法生成PDF报告")
-    
-    print(f"PDF报告数据验证通过：")
-    print(f"- 计算结果项目数: {len(calculations)}")
-    print(f"- 百分比数据项目数: {len(percentages)}")
-    print(f"- 光谱数据行数: {len(df_clean)}")
-    
-    # 创建字节流
-    buffer = io.BytesIO()
     
-    # 创建PDF文档
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
+    logger.debug("图表生成数据验证：光谱数据点数 %d，计算结果数量 %d，百分比数据数量 %d",
+                 len(df_clean), len(calculations), len(percentages))
     
-    # 获取样式
-    styles = getSampleStyleSheet()
+    try:
+        chart_bytes = render_chart_images(
+            df_clean['wavelength'].to_numpy(dtype=float),
+            df_clean['radiation'].to_numpy(dtype=float),
+            percentages,
+            calculations.get('crop_suitability', {})
+        )
+    except Exception as e:
+        st.error(f"生成图表时出错: {str(e)}")
+        # 如果生成图表失败，返回空字典
+        return {}
     
-    # 注册中文字体（优先使用本地字体，再尝试系统字体）
+    return chart_bytes
+
+@st.cache_resource(show_spinner=False)
+def register_pdf_chinese_font():
+    """注册PDF报告使用的中文字体（优先使用本地字体，再尝试系统字体），每个进程只执行一次，返回字体名"""
     chinese_font = 'Helvetica'  # 默认字体
     font_loaded = False
     try:
-        import platform
         from reportlab.pdfbase import pdfmetrics
         from reportlab.pdfbase.ttfonts import TTFont
         from reportlab.pdfbase.cidfonts import UnicodeCIDFont
         import reportlab.lib.fonts
-        import os
         
         # 获取系统信息
-        system = platform.system()
-        print(f"📊 系统信息: {system}")
+        system = SYSTEM_NAME
+        logger.debug("📊 系统信息: %s", system)
         
         # 首先尝试使用项目中的本地中文字体，检查多种可能的扩展名
-        font_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+        font_dir = FONTS_DIR
         font_name = 'NotoSansSC-Regular'
         possible_extensions = ['.ttf', '.otf', '.ttc']
         local_font_path = None
@@ -511,7 +831,7 @@ def generate_pdf_report(results, df_clean):
             test_path = os.path.join(font_dir, f"{font_name}{ext}")
             if os.path.exists(test_path):
                 local_font_path = test_path
-                print(f"🔍 找到字体文件: {local_font_path}")
+                logger.debug("🔍 找到字体文件: %s", local_font_path)
                 break
         
         # 尝试加载本地字体
@@ -529,25 +849,24 @@ def generate_pdf_report(results, df_clean):
                 
                 chinese_font = 'ChineseFont'
                 font_loaded = True
-                print(f"✅ 成功注册本地中文字体到PDF: {local_font_path}")
-                print(f"✅ 字体映射设置完成")
+                logger.debug("✅ 成功注册本地中文字体到PDF: %s", local_font_path)
             except Exception as e:
-                print(f"⚠️ 注册本地字体到PDF失败: {str(e)}")
+                logger.warning("⚠️ 注册本地字体到PDF失败: %s", e)
                 # 尝试替代方案 - 使用CID字体
                 try:
                     pdfmetrics.registerFont(UnicodeCIDFont('STSong-Light'))
                     pdfmetrics.registerFontFamily('STSong', normal='STSong-Light', bold='STSong-Light', italic='STSong-Light', boldItalic='STSong-Light')
                     chinese_font = 'STSong-Light'
                     font_loaded = True
-                    print(f"✅ 成功注册CID中文字体: STSong-Light")
+                    logger.debug("✅ 成功注册CID中文字体: STSong-Light")
                 except Exception as e2:
-                    print(f"⚠️ 注册CID字体失败: {str(e2)}")
+                    logger.warning("⚠️ 注册CID字体失败: %s", e2)
         else:
-            print(f"❌ 未找到字体文件在: {font_dir}")
+            logger.warning("❌ 未找到字体文件在: %s", font_dir)
         
         # 如果本地字体加载失败，尝试系统字体
         if not font_loaded:
-            print("🔄 尝试加载系统中文字体...")
+            logger.debug("🔄 尝试加载系统中文字体...")
             
             # 根据系统设置字体路径
             if system == "Windows":
@@ -558,7 +877,7 @@ def generate_pdf_report(results, df_clean):
                     ('C:/Windows/Fonts/msyh.ttc', 'MicrosoftYaHei'), # 微软雅黑
                     ('C:/Windows/Fonts/simkai.ttf', 'KaiTi')         # 楷体
                 ]
-                print(f"🔍 Windows系统: 尝试加载以下字体")
+                logger.debug("🔍 Windows系统: 尝试加载以下字体")
                 
             elif system == "Darwin":  # macOS
                 # macOS系统尝试多种中文字体
@@ -568,7 +887,7 @@ def generate_pdf_report(results, df_clean):
                     ('/System/Library/Fonts/STHeiti Light.ttc', 'STHeiti'),
                     ('/System/Library/Fonts/STKaiti.ttc', 'STKaiti')
                 ]
-                print(f"🔍 macOS系统: 尝试加载以下字体")
+                logger.debug("🔍 macOS系统: 尝试加载以下字体")
                 
             else:  # Linux系统
                 # Linux系统尝试常见中文字体路径
@@ -578,14 +897,14 @@ def generate_pdf_report(results, df_clean):
                     ('/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc', 'WenQuanYiZenHei'),
                     ('/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc', 'NotoSansCJK')
                 ]
-                print(f"🔍 Linux系统: 尝试加载以下字体")
+                logger.debug("🔍 Linux系统: 尝试加载以下字体")
             
             # 尝试加载系统字体
             for font_path, font_alias in font_paths:
-                print(f"   - {font_alias}: {font_path}")
+                logger.debug("   - %s: %s", font_alias, font_path)
                 if os.path.exists(font_path):
                     try:
-                        print(f"   ↳ 找到字体文件，尝试注册...")
+                        logger.debug("   ↳ 找到字体文件，尝试注册...")
                         # 注册字体
                         if font_path.endswith('.ttf'):
                             pdfmetrics.registerFont(TTFont(font_alias, font_path))
@@ -607,16 +926,15 @@ def generate_pdf_report(results, df_clean):
                         
                         chinese_font = font_alias
                         font_loaded = True
-                        print(f"✅ 成功注册系统字体: {font_alias} ({font_path})")
-                        print(f"✅ 字体映射设置完成")
+                        logger.debug("✅ 成功注册系统字体: %s (%s)", font_alias, font_path)
                         break
                     except Exception as e:
-                        print(f"⚠️ 注册字体失败: {str(e)}")
+                        logger.warning("⚠️ 注册字体失败: %s", e)
                         continue
             
             # 如果仍然没有加载到字体，尝试默认CID字体
             if not font_loaded:
-                print("🔄 尝试加载默认CID中文字体...")
+                logger.debug("🔄 尝试加载默认CID中文字体...")
                 try:
                     pdfmetrics.registerFont(UnicodeCIDFont('STSong-Light'))
                     pdfmetrics.registerFontFamily('STSong', 
@@ -626,12 +944,12 @@ def generate_pdf_report(results, df_clean):
                                                 boldItalic='STSong-Light')
                     chinese_font = 'STSong-Light'
                     font_loaded = True
-                    print(f"✅ 成功注册CID中文字体: STSong-Light")
+                    logger.debug("✅ 成功注册CID中文字体: STSong-Light")
                 except Exception as e:
-                    print(f"⚠️ 注册CID字体失败: {str(e)}")
+                    logger.warning("⚠️ 注册CID字体失败: %s", e)
                         
     except Exception as e:
-        print(f"❌ 字体注册异常: {str(e)}")
+        logger.warning("❌ 字体注册异常: %s", e)
         # 最后的尝试 - 直接设置reportlab支持中文的默认字体
         try:
             from reportlab.pdfbase.cidfonts import UnicodeCIDFont
@@ -643,12 +961,72 @@ def generate_pdf_report(results, df_clean):
                                         boldItalic='STSong-Light')
             chinese_font = 'STSong-Light'
             font_loaded = True
-            print(f"✅ 异常恢复: 成功注册CID中文字体")
+            logger.debug("✅ 异常恢复: 成功注册CID中文字体")
         except Exception as e2:
-            print(f"❌ 无法恢复: {str(e2)}")
+            logger.error("❌ 无法恢复: %s", e2)
             chinese_font = 'Helvetica'  # 最后回退到默认字体
     
-    print(f"📋 最终使用字体: {chinese_font}")
+    logger.debug("📋 最终使用字体: %s", chinese_font)
+    return chinese_font
+
+@st.cache_resource(show_spinner=False)
+def get_table_style(font_name, align, header_font_size, body_font_size):
+    """PDF报告表格共用同一套配色与网格，只有字体、对齐方式和字号不同；每种组合每个进程只构造一次"""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), align),
+        ('FONTNAME', (0, 0), (-1, -1), font_name),  # 使用中文字体
+        ('FONTSIZE', (0, 0), (-1, 0), header_font_size),
+        ('FONTSIZE', (0, 1), (-1, -1), body_font_size),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+def generate_pdf_report(results, df_clean):
+    """生成PDF格式的分析报告"""
+    
+    # 验证输入数据的完整性
+    if not results or not isinstance(results, dict):
+        raise ValueError("分析结果数据不完整，无法生成PDF报告")
+    
+    if df_clean is None or df_clean.empty:
+        raise ValueError("光谱数据不完整，无法生成PDF报告")
+    
+    # 验证核心数据是否存在
+    calculations = results.get('calculations', {})
+    percentages = results.get('percentages', {})
+    basic_info = results.get('basic_info', {})
+    input_params = results.get('input_params', {})
+    
+    if not calculations:
+        raise ValueError("计算结果为空，无法生成PDF报告")
+    
+    logger.debug("PDF报告数据验证通过：计算结果项目数 %d，百分比数据项目数 %d，光谱数据行数 %d",
+                 len(calculations), len(percentages), len(df_clean))
+    
+    # 按需导入报告排版所需的reportlab模块
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    
+    # 创建字节流
+    buffer = io.BytesIO()
+    
+    # 创建PDF文档
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
+    
+    # 获取样式
+    styles = getSampleStyleSheet()
+    
+    # 注册中文字体（每个进程只注册一次）
+    chinese_font = register_pdf_chinese_font()
     
     # 创建自定义样式（支持中文）
     # 为每种样式添加字体回退机制
@@ -703,7 +1081,7 @@ def generate_pdf_report(results, df_clean):
         encoding='UTF-8'
     )
     
-    print("📝 PDF样式创建完成，所有样式已应用中文字体设置")
+    logger.debug("📝 PDF样式创建完成，所有样式已应用中文字体设置")
     
     # 内容列表
     story = []
@@ -737,17 +1115,7 @@ def generate_pdf_report(results, df_clean):
     ]
     
     basic_table = Table(basic_data, colWidths=[2*inch, 3*inch])
-    basic_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),  # 使用中文字体
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    basic_table.setStyle(get_table_style(chinese_font, 'LEFT', 12, 10))
     
     story.append(basic_table)
     story.append(Spacer(1, 20))
@@ -756,33 +1124,24 @@ def generate_pdf_report(results, df_clean):
     story.append(Paragraph("综合评价", heading_style))
     
     calculations = results.get('calculations', {})
+    display_fields = format_display_fields(results)
     
     # 综合评价表格
     eval_data = [
         ['评价项目', '数值', '等级'],
-        ['总体评级', f"{calculations.get('quality_rating', '未知')}", ''],
+        ['总体评级', f"{display_fields['quality_rating']}", ''],
         ['PPE (光合光子效率)', f"{calculations.get('ppe', 0):.3f} μmol/J", 
-         "优秀" if calculations.get('ppe', 0) > 2.5 else "良好" if calculations.get('ppe', 0) > 2.0 else "一般"],
+         classify_by_thresholds(calculations.get('ppe', 0), PPE_RATING_THRESHOLDS, RATING_LABELS)],
         ['PAR占比', f"{calculations.get('par_ratio', 0)*100:.1f}%", 
-         "优秀" if calculations.get('par_ratio', 0) > 0.8 else "良好" if calculations.get('par_ratio', 0) > 0.6 else "一般"],
+         classify_by_thresholds(calculations.get('par_ratio', 0), PAR_RATING_THRESHOLDS, RATING_LABELS)],
         ['R/B比', f"{calculations.get('r_b_ratio', 0):.2f}", 
          "适宜" if 0.5 <= calculations.get('r_b_ratio', 0) <= 3.0 else "偏离"],
         ['光能比', f"{calculations.get('light_energy_ratio', 0):.3f}", 
-         "高效" if calculations.get('light_energy_ratio', 0) > 0.5 else "中等" if calculations.get('light_energy_ratio', 0) > 0.3 else "低效"]
+         classify_by_thresholds(calculations.get('light_energy_ratio', 0), LIGHT_ENERGY_RATING_THRESHOLDS, LIGHT_ENERGY_RATING_LABELS)]
     ]
     
     eval_table = Table(eval_data, colWidths=[2*inch, 2*inch, 1.5*inch])
-    eval_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    eval_table.setStyle(get_table_style(chinese_font, 'CENTER', 10, 9))
     
     story.append(eval_table)
     story.append(Spacer(1, 20))
@@ -802,17 +1161,7 @@ def generate_pdf_report(results, df_clean):
     ]
     
     performance_table = Table(performance_data, colWidths=[1.5*inch, 1.2*inch, 0.8*inch, 2*inch])
-    performance_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    performance_table.setStyle(get_table_style(chinese_font, 'CENTER', 9, 8))
     
     story.append(performance_table)
     story.append(PageBreak())
@@ -823,38 +1172,11 @@ def generate_pdf_report(results, df_clean):
     # 添加光谱分布图（修复长宽比）
     if 'spectrum' in chart_images:
         story.append(Paragraph("光谱分布分析", heading_style))
-        chart_images['spectrum'].seek(0)
         
-        # 获取图片实际尺寸并保持长宽比
+        # 从PNG头部读取像素尺寸，在限定区域内保持长宽比
         try:
-            from PIL import Image as PILImage
-            pil_img = PILImage.open(chart_images['spectrum'])
-            original_width, original_height = pil_img.size
-            
-            # 设置最大宽度为6英寸，按比例计算高度
-            max_width = 6 * inch
-            aspect_ratio = original_height / original_width
-            img_height = max_width * aspect_ratio
-            
-            # 如果高度过大，限制高度并重新计算宽度
-            max_height = 4 * inch
-            if img_height > max_height:
-                img_height = max_height
-                img_width = img_height / aspect_ratio
-            else:
-                img_width = max_width
-            
-            # 重置流位置
-            chart_images['spectrum'].seek(0)
-            img = Image(chart_images['spectrum'], width=img_width, height=img_height)
-            story.append(img)
-            story.append(Spacer(1, 20))
-            
-        except ImportError:
-            # 如果PIL不可用，使用默认尺寸
-            chart_images['spectrum'].seek(0)
-            img = Image(chart_images['spectrum'], width=6*inch, height=3*inch)
-            story.append(img)
+            img_width, img_height = fit_chart_size(chart_images['spectrum'], 6 * inch, 4 * inch)
+            story.append(Image(io.BytesIO(chart_images['spectrum']), width=img_width, height=img_height))
             story.append(Spacer(1, 20))
         except Exception as e:
             story.append(Paragraph(f"光谱图加载失败: {str(e)}", normal_style))
@@ -877,17 +1199,7 @@ def generate_pdf_report(results, df_clean):
     ]
     
     spectrum_table = Table(spectrum_data, colWidths=[1.2*inch, 1.2*inch, 1.2*inch, 1*inch, 1.4*inch])
-    spectrum_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    spectrum_table.setStyle(get_table_style(chinese_font, 'CENTER', 9, 8))
     
     story.append(spectrum_table)
     story.append(Spacer(1, 20))
@@ -895,36 +1207,11 @@ def generate_pdf_report(results, df_clean):
     # 添加光质分布饼图（修复长宽比）
     if 'pie' in chart_images:
         story.append(Paragraph("光质分布占比", subheading_style))
-        chart_images['pie'].seek(0)
         
-        # 获取饼图实际尺寸并保持长宽比
+        # 从PNG头部读取像素尺寸，在限定区域内保持长宽比
         try:
-            from PIL import Image as PILImage
-            pil_img = PILImage.open(chart_images['pie'])
-            original_width, original_height = pil_img.size
-            
-            # 饼图通常是正方形，设置合适的尺寸
-            img_size = 4 * inch
-            aspect_ratio = original_height / original_width
-            
-            if aspect_ratio > 1:  # 高度大于宽度
-                img_height = img_size
-                img_width = img_size / aspect_ratio
-            else:  # 宽度大于等于高度
-                img_width = img_size
-                img_height = img_size * aspect_ratio
-            
-            # 重置流位置
-            chart_images['pie'].seek(0)
-            img = Image(chart_images['pie'], width=img_width, height=img_height)
-            story.append(img)
-            story.append(Spacer(1, 20))
-            
-        except ImportError:
-            # 如果PIL不可用，使用默认尺寸
-            chart_images['pie'].seek(0)
-            img = Image(chart_images['pie'], width=4*inch, height=4*inch)
-            story.append(img)
+            img_width, img_height = fit_chart_size(chart_images['pie'], 4 * inch, 4 * inch)
+            story.append(Image(io.BytesIO(chart_images['pie']), width=img_width, height=img_height))
             story.append(Spacer(1, 20))
         except Exception as e:
             story.append(Paragraph(f"饼图加载失败: {str(e)}", normal_style))
@@ -933,26 +1220,20 @@ def generate_pdf_report(results, df_clean):
     # 植物生理响应指标
     story.append(Paragraph("植物生理响应指标", heading_style))
     
-    physio_data = [
-        ['指标', '数值', '作用机制', '影响'],
-        ['隐花色素活性', f"{calculations.get('crypto_activity', 0):.3f}", '感受蓝光和UV-A', '调节向光性和生物钟'],
-        ['光敏色素活性', f"{calculations.get('phyto_activity', 0):.3f}", '感受红光/远红光', '调节光周期响应'],
-        ['花青素合成指数', f"{calculations.get('anthocyanin_index', 0):.3f}", '紫光和蓝光诱导', '提高抗逆性和着色'],
-        ['叶绿素合成指数', f"{calculations.get('chlorophyll_synthesis', 0):.3f}", '红蓝光协同作用', '促进光合色素形成']
+    physio_indicators = [
+        ('隐花色素活性', 'crypto_activity', '感受蓝光和UV-A', '调节向光性和生物钟'),
+        ('光敏色素活性', 'phyto_activity', '感受红光/远红光', '调节光周期响应'),
+        ('花青素合成指数', 'anthocyanin_index', '紫光和蓝光诱导', '提高抗逆性和着色'),
+        ('叶绿素合成指数', 'chlorophyll_synthesis', '红蓝光协同作用', '促进光合色素形成')
     ]
+    physio_data = [['指标', '数值', '作用机制', '影响']]
+    physio_data.extend(
+        [name, f"{calculations.get(key, 0):.3f}", mechanism, effect]
+        for name, key, mechanism, effect in physio_indicators
+    )
     
     physio_table = Table(physio_data, colWidths=[1.5*inch, 1*inch, 1.8*inch, 1.7*inch])
-    physio_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    physio_table.setStyle(get_table_style(chinese_font, 'LEFT', 9, 8))
     
     story.append(physio_table)
     story.append(PageBreak())
@@ -960,35 +1241,11 @@ def generate_pdf_report(results, df_clean):
     # 添加作物适应性雷达图（修复长宽比）
     if 'radar' in chart_images:
         story.append(Paragraph("作物适应性评价", heading_style))
-        chart_images['radar'].seek(0)
         
-        # 雷达图通常也接近正方形
+        # 从PNG头部读取像素尺寸，在限定区域内保持长宽比
         try:
-            from PIL import Image as PILImage
-            pil_img = PILImage.open(chart_images['radar'])
-            original_width, original_height = pil_img.size
-            
-            img_size = 4.5 * inch
-            aspect_ratio = original_height / original_width
-            
-            if aspect_ratio > 1:
-                img_height = img_size
-                img_width = img_size / aspect_ratio
-            else:
-                img_width = img_size
-                img_height = img_size * aspect_ratio
-            
-            # 重置流位置
-            chart_images['radar'].seek(0)
-            img = Image(chart_images['radar'], width=img_width, height=img_height)
-            story.append(img)
-            story.append(Spacer(1, 20))
-            
-        except ImportError:
-            # 如果PIL不可用，使用默认尺寸
-            chart_images['radar'].seek(0)
-            img = Image(chart_images['radar'], width=4.5*inch, height=4.5*inch)
-            story.append(img)
+            img_width, img_height = fit_chart_size(chart_images['radar'], 4.5 * inch, 4.5 * inch)
+            story.append(Image(io.BytesIO(chart_images['radar']), width=img_width, height=img_height))
             story.append(Spacer(1, 20))
         except Exception as e:
             story.append(Paragraph(f"雷达图加载失败: {str(e)}", normal_style))
@@ -998,34 +1255,13 @@ def generate_pdf_report(results, df_clean):
     crop_suitability = calculations.get('crop_suitability', {})
     crop_data = [['作物类型', '适应性评分', '评价等级', '推荐应用']]
     
-    crop_recommendations = {
-        '叶菜类': '生菜、菠菜、小白菜、芹菜',
-        '果菜类': '番茄、黄瓜、辣椒、茄子',
-        '育苗专用': '各类蔬菜育苗、花卉育苗'
-    }
-    
     for crop_type, score in crop_suitability.items():
-        if score >= 80:
-            level = "优秀"
-        elif score >= 60:
-            level = "良好"
-        else:
-            level = "一般"
-        recommendation = crop_recommendations.get(crop_type, '通用')
+        level = classify_by_thresholds(score, SCORE_RATING_THRESHOLDS, RATING_LABELS, inclusive=True)
+        recommendation = CROP_RECOMMENDATIONS.get(crop_type, '通用')
         crop_data.append([crop_type, f"{score}分", level, recommendation])
     
     crop_table = Table(crop_data, colWidths=[1.5*inch, 1.2*inch, 1*inch, 2.3*inch])
-    crop_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    crop_table.setStyle(get_table_style(chinese_font, 'CENTER', 9, 8))
     
     story.append(crop_table)
     story.append(Spacer(1, 20))
@@ -1037,30 +1273,12 @@ def generate_pdf_report(results, df_clean):
     if growth_stages:
         growth_data = [['生长阶段', '适配性评分', '光谱特点需求']]
         
-        stage_requirements = {
-            '发芽期': '适量蓝光和红光，促进发芽',
-            '苗期': '高蓝光比例，控制徒长',
-            '营养生长期': '平衡红蓝光，促进叶片发育',
-            '开花期': '高红光比例，促进花芽分化',
-            '结果期': '均衡光谱，高光强需求'
-        }
-        
         for stage, score in growth_stages.items():
-            requirement = stage_requirements.get(stage, '平衡光谱')
+            requirement = GROWTH_STAGE_REQUIREMENTS.get(stage, '平衡光谱')
             growth_data.append([stage, f"{score}分", requirement])
         
         growth_table = Table(growth_data, colWidths=[1.5*inch, 1.5*inch, 3*inch])
-        growth_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        growth_table.setStyle(get_table_style(chinese_font, 'LEFT', 9, 8))
         
         story.append(growth_table)
         story.append(Spacer(1, 20))
@@ -1069,12 +1287,12 @@ def generate_pdf_report(results, df_clean):
     story.append(Paragraph("光谱优化建议", heading_style))
     
     suggestions = calculations.get('optimization_suggestions', [])
-    if len(suggestions) == 1 and "较为合理" in suggestions[0]:
+    if suggestions == [DEFAULT_OPTIMIZATION_SUGGESTION]:
         suggestion_text = f"✓ {suggestions[0]}"
     else:
-        suggestion_text = "检测到以下可优化项目：<br/>"
-        for i, suggestion in enumerate(suggestions, 1):
-            suggestion_text += f"{i}. {suggestion}<br/>"
+        suggestion_text = "检测到以下可优化项目：<br/>" + "".join(
+            f"{i}. {suggestion}<br/>" for i, suggestion in enumerate(suggestions, 1)
+        )
     
     story.append(Paragraph(suggestion_text, normal_style))
     story.append(Spacer(1, 20))
@@ -1093,17 +1311,7 @@ def generate_pdf_report(results, df_clean):
     ]
     
     calc_table = Table(calculation_data, colWidths=[2*inch, 1.5*inch, 2.5*inch])
-    calc_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    calc_table.setStyle(get_table_style(chinese_font, 'LEFT', 9, 8))
     
     story.append(calc_table)
     story.append(Spacer(1, 20))
@@ -1146,9 +1354,8 @@ def generate_pdf_report(results, df_clean):
     # 生成PDF
     doc.build(story)
     
-    # 获取PDF数据
-    buffer.seek(0)
-    pdf_data = buffer.read()
+    # 获取PDF数据（getvalue直接返回缓冲区内容，无需回绕后再读取一遍）
+    pdf_data = buffer.getvalue()
     buffer.close()
     
     return pdf_data
@@ -1172,32 +1379,7 @@ def main():
     )
     
     # 添加自定义CSS样式
-    st.markdown("""
-    <style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        text-align: center;
-        background: linear-gradient(90deg, #FF6B6B, #4ECDC4, #45B7D1);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin-bottom: 2rem;
-    }
-    .theory-box {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 1.5rem;
-        border-radius: 10px;
-        color: white;
-        margin: 1rem 0;
-    }
-    .metric-card {
-        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-        padding: 1rem;
-        border-radius: 8px;
-        margin: 0.5rem 0;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
     
     # 主标题
     st.markdown('<h1 class="main-header">🌱 LED植物照明光学度量体系分析系统</h1>', unsafe_allow_html=True)
@@ -1447,25 +1629,8 @@ def main():
         # 提供示例文件下载
         st.markdown("**📥 下载示例文件：**")
         
-        # 创建更完整的示例数据
-        sample_wavelengths = np.arange(380, 781, 5)  # 380-780nm，每5nm一个点
-        sample_radiations = []
-        
-        for wl in sample_wavelengths:
-            # 模拟一个典型的LED光谱（蓝红双峰）
-            blue_peak = np.exp(-0.5 * ((wl - 450) / 25) ** 2) * 0.8
-            red_peak = np.exp(-0.5 * ((wl - 660) / 30) ** 2) * 1.0
-            green_component = np.exp(-0.5 * ((wl - 520) / 40) ** 2) * 0.2
-            radiation = blue_peak + red_peak + green_component + np.random.normal(0, 0.02)
-            sample_radiations.append(max(0, radiation))  # 确保非负值
-        
-        sample_df = pd.DataFrame({
-            '波长(nm)': sample_wavelengths,
-            '辐射强度': sample_radiations
-        })
-        
-        # 转换为CSV格式供下载
-        csv_data = sample_df.to_csv(index=False)
+        # 示例数据与CSV文本只生成一次，之后的重新运行直接复用
+        csv_data = build_sample_csv()
         
         st.download_button(
             label="📥 下载CSV示例文件",
@@ -1490,19 +1655,44 @@ def main():
         - 辐射值应大于等于0
         """)
     
-    uploaded_file = st.file_uploader(
+    uploaded_files = st.file_uploader(
         "选择光谱数据文件 (CSV/TXT/Excel)", 
         type=['csv', 'txt', 'xlsx', 'xls'],
-        help="请确保文件格式符合上述要求"
+        accept_multiple_files=True,
+        help="请确保文件格式符合上述要求；同时上传多个文件时将进行多灯具对比分析"
     )
     
-    if uploaded_file is not None:
+    if len(uploaded_files) > 1:
+        # 多灯具对比模式：每个文件作为一个灯具，以文件名标识
+        batch_results = []
+        for uploaded_file in uploaded_files:
+            with st.expander(f"📄 {uploaded_file.name} 数据检查", expanded=False):
+                try:
+                    df = read_spectrum_file(uploaded_file)
+                    if df.shape[1] < 2:
+                        st.error("数据文件格式不正确，请确保文件至少包含两列数据")
+                        continue
+                    df.columns = ['wavelength', 'radiation'] + list(df.columns[2:])
+                    results, df_clean = calculate_light_analysis(
+                        df, total_radiation_flux, total_power, back_panel_temp, power_factor,
+                        uploaded_file.name, manufacturer, test_date
+                    )
+                except Exception as e:
+                    st.error(f"读取文件时发生错误: {str(e)}")
+                    continue
+            if results is not None:
+                batch_results.append(results)
+            else:
+                st.warning(f"无法完成 {uploaded_file.name} 的分析，请检查数据文件格式和内容")
+        
+        if batch_results:
+            display_results_batch(batch_results)
+    
+    elif uploaded_files:
+        uploaded_file = uploaded_files[0]
         # 读取数据
         try:
-            if uploaded_file.name.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(uploaded_file)
-            else:
-                df = pd.read_csv(uploaded_file)
+            df = read_spectrum_file(uploaded_file)
             
             # 确保数据有正确的列名
             if df.shape[1] >= 2:
@@ -1533,23 +1723,40 @@ def main():
     else:
         st.info("请上传包含波长和辐射数据的文件")
 
+def calculate_suitability_scores(r_b_ratio, r_fr_ratio, uva_b_ratio, par_ratio, ppe,
+                                 blue_percentage, green_percentage, red_percentage, far_red_percentage,
+                                 uva_percentage, spectral_completeness):
+    """计算作物适应性与生长阶段适配性评分（仅依赖标量指标的纯计算）"""
+    metrics = {
+        'r_b_ratio': r_b_ratio, 'r_fr_ratio': r_fr_ratio, 'uva_b_ratio': uva_b_ratio,
+        'par_ratio': par_ratio, 'ppe': ppe,
+        'blue_percentage': blue_percentage, 'green_percentage': green_percentage,
+        'red_percentage': red_percentage, 'far_red_percentage': far_red_percentage,
+        'uva_percentage': uva_percentage, 'spectral_completeness': spectral_completeness,
+    }
+    
+    # 不同作物类型的专业评价
+    crop_suitability = score_by_rules(metrics, CROP_SUITABILITY_RULES)
+    
+    # 植物生长阶段适配性评价
+    growth_stage_suitability = score_by_rules(metrics, GROWTH_STAGE_RULES)
+    
+    return crop_suitability, growth_stage_suitability
+
+def read_spectrum_file(uploaded_file):
+    """读取上传的光谱数据文件（CSV/TXT/Excel）"""
+    if uploaded_file.name.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(uploaded_file)
+    return pd.read_csv(uploaded_file)
+
 def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_temp, power_factor, lamp_model, manufacturer, test_date):
     """计算光效分析结果"""
     
-    # 显示原始数据信息
-    st.info(f"📊 原始数据信息：共 {len(df)} 行，{df.shape[1]} 列")
-    
     # 检查列名
     if df.shape[1] < 2:
         st.error("❌ 数据文件至少需要包含两列数据（波长和辐射值）")
         return None, None
     
-    # 显示列名信息
-    st.write(f"📋 检测到的列名：{list(df.columns)}")
-    
-    # 检查数据类型和内容
-    st.write("🔍 数据质量检查：")
-    
     # 检查第一列（波长）
     wavelength_col = df.iloc[:, 0]
     radiation_col = df.iloc[:, 1]
@@ -1557,14 +1764,19 @@ def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_t
     wavelength_issues = []
     radiation_issues = []
     
+    # 两列各只做一次数值转换（无效值变为NaN），质量检查与后续清洗共用转换结果
+    def to_numeric_column(column):
+        try:
+            return pd.to_numeric(column, errors='coerce')
+        except (TypeError, ValueError):
+            return pd.Series(np.nan, index=column.index)
+    
+    wavelength_numeric = to_numeric_column(wavelength_col)
+    radiation_numeric = to_numeric_column(radiation_col)
+    
     # 波长数据检查
     wavelength_null_count = wavelength_col.isnull().sum()
-    wavelength_non_numeric = 0
-    try:
-        wavelength_numeric = pd.to_numeric(wavelength_col, errors='coerce')
-        wavelength_non_numeric = wavelength_numeric.isnull().sum() - wavelength_null_count
-    except:
-        wavelength_non_numeric = len(wavelength_col)
+    wavelength_non_numeric = wavelength_numeric.isnull().sum() - wavelength_null_count
     
     if wavelength_null_count > 0:
         wavelength_issues.append(f"包含 {wavelength_null_count} 个空值")
@@ -1573,47 +1785,35 @@ def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_t
     
     # 辐射数据检查
     radiation_null_count = radiation_col.isnull().sum()
-    radiation_non_numeric = 0
-    try:
-        radiation_numeric = pd.to_numeric(radiation_col, errors='coerce')
-        radiation_non_numeric = radiation_numeric.isnull().sum() - radiation_null_count
-    except:
-        radiation_non_numeric = len(radiation_col)
+    radiation_non_numeric = radiation_numeric.isnull().sum() - radiation_null_count
     
     if radiation_null_count > 0:
         radiation_issues.append(f"包含 {radiation_null_count} 个空值")
     if radiation_non_numeric > 0:
         radiation_issues.append(f"包含 {radiation_non_numeric} 个非数值")
     
-    # 显示数据问题
-    if wavelength_issues:
-        st.warning(f"⚠️ 波长列（第1列）问题：{', '.join(wavelength_issues)}")
+    # 数据诊断信息只在发现问题时展开显示，正常数据只给出一行摘要
+    if wavelength_issues or radiation_issues:
+        st.info(f"📊 原始数据信息：共 {len(df)} 行，{df.shape[1]} 列；检测到的列名：{list(df.columns)}")
+        if wavelength_issues:
+            st.warning(f"⚠️ 波长列（第1列）问题：{', '.join(wavelength_issues)}")
+        if radiation_issues:
+            st.warning(f"⚠️ 辐射列（第2列）问题：{', '.join(radiation_issues)}")
+        st.write("📋 数据前5行预览：")
+        st.dataframe(df.head(), use_container_width=True)
     else:
-        st.success("✅ 波长列数据格式正确")
-        
-    if radiation_issues:
-        st.warning(f"⚠️ 辐射列（第2列）问题：{', '.join(radiation_issues)}")
-    else:
-        st.success("✅ 辐射列数据格式正确")
-    
-    # 显示数据样例
-    st.write("📋 数据前5行预览：")
-    st.dataframe(df.head(), use_container_width=True)
+        st.caption(f"✅ 数据格式检查通过：共 {len(df)} 行，{df.shape[1]} 列")
     
     # 尝试数据转换和清洗
     try:
-        # 强制转换为数值类型，无效值变为NaN
-        df_converted = df.copy()
-        df_converted.iloc[:, 0] = pd.to_numeric(df_converted.iloc[:, 0], errors='coerce')
-        df_converted.iloc[:, 1] = pd.to_numeric(df_converted.iloc[:, 1], errors='coerce')
-        
-        # 重新设置列名
-        df_converted.columns = ['wavelength', 'radiation'] + list(df_converted.columns[2:])
+        # 直接用已转换的两列构造数据，不复制原始数据中用不到的其余列
+        df_converted = pd.DataFrame({'wavelength': wavelength_numeric, 'radiation': radiation_numeric})
         
         # 删除包含NaN的行
-        df_clean = df_converted.dropna(subset=['wavelength', 'radiation'])
+        df_clean = df_converted.dropna()
         
-        st.write(f"🧹 数据清洗结果：从 {len(df)} 行清洗到 {len(df_clean)} 行")
+        if len(df_clean) < len(df):
+            st.write(f"🧹 数据清洗结果：从 {len(df)} 行清洗到 {len(df_clean)} 行")
         
         # 检查清洗后的数据是否为空
         if df_clean.empty or len(df_clean) == 0:
@@ -1648,15 +1848,16 @@ def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_t
             
             return None, None
         
+        # 后续计算全部基于ndarray进行，不再经过pandas索引
+        wavelength = df_clean['wavelength'].to_numpy(dtype=np.float64, copy=False)
+        radiation = df_clean['radiation'].to_numpy(dtype=np.float64, copy=False)
+        
         # 显示清洗后的数据范围
-        wavelength_range = f"{df_clean['wavelength'].min():.0f} - {df_clean['wavelength'].max():.0f} nm"
-        radiation_range = f"{df_clean['radiation'].min():.3f} - {df_clean['radiation'].max():.3f}"
+        wavelength_range = f"{wavelength.min():.0f} - {wavelength.max():.0f} nm"
+        radiation_range = f"{radiation.min():.3f} - {radiation.max():.3f}"
         
         st.success(f"✅ 数据清洗成功！波长范围：{wavelength_range}，辐射范围：{radiation_range}")
         
-        wavelength = df_clean['wavelength'].astype(float).values
-        radiation = df_clean['radiation'].astype(float).values
-        
         # 检查数组长度是否一致
         if len(wavelength) != len(radiation):
             min_len = min(len(wavelength), len(radiation))
@@ -1673,16 +1874,18 @@ def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_t
         integration_values = (wavelength * radiation) / 119.8
         
         # 检查是否有无效值，同时保持数组长度一致
-        valid_mask = ~(np.isnan(integration_values) | np.isinf(integration_values))
+        valid_mask = np.isfinite(integration_values)
         
-        if not np.any(valid_mask):
-            st.error("所有计算结果都包含无效值，请检查数据质量")
-            return None, None
+        # 通常所有值都有效，此时无需再按掩码复制三个数组
+        if not valid_mask.all():
+            if not valid_mask.any():
+                st.error("所有计算结果都包含无效值，请检查数据质量")
+                return None, None
             
-        # 应用掩码保持所有数组长度一致
-        wavelength = wavelength[valid_mask]
-        radiation = radiation[valid_mask]
-        integration_values = integration_values[valid_mask]
+            # 应用掩码保持所有数组长度一致
+            wavelength = wavelength[valid_mask]
+            radiation = radiation[valid_mask]
+            integration_values = integration_values[valid_mask]
         
         # 最终检查数据是否还有剩余
         if len(wavelength) == 0:
@@ -1699,122 +1902,80 @@ def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_t
     # 3. 总积分 (所有辐射值求和)
     total_integration = np.sum(radiation)
     
-    # 4. 不同波长范围的积分计算
-    def calculate_wavelength_range_integration(df_data, integration_vals, min_wave, max_wave, include_upper=False):
-        """计算波长范围内的积分值求和（用于光合有效积分的各波段）"""
-        if include_upper:
-            mask = (df_data['wavelength'] >= min_wave) & (df_data['wavelength'] <= max_wave)
-        else:
-            mask = (df_data['wavelength'] >= min_wave) & (df_data['wavelength'] < max_wave)
-        return integration_vals[mask].sum()
-    
-    def calculate_wavelength_range_radiation(df_data, radiation_vals, min_wave, max_wave, include_upper=False):
-        """计算波长范围内的辐射值求和（用于PAR积分等）"""
-        if include_upper:
-            mask = (df_data['wavelength'] >= min_wave) & (df_data['wavelength'] <= max_wave)
-        else:
-            mask = (df_data['wavelength'] >= min_wave) & (df_data['wavelength'] < max_wave)
-        return radiation_vals[mask].sum()
+    # 4. 不同波长范围的积分计算：按波长排序一次，各波段（可重叠）均为有序数组上的一段连续切片，
+    # 边界由一次二分查找得到，无需为每个波段构造整段布尔掩码
+    order = np.argsort(wavelength, kind='stable')
+    sorted_wavelength = wavelength[order]
+    sorted_radiation = radiation[order]
+    sorted_integration_values = integration_values[order]
     
     # PAR积分 (400-700nm辐射值总和，不包括700)
-    par_integration = calculate_wavelength_range_radiation(df_clean, radiation, 400, 700)
+    par_start, par_end = np.searchsorted(sorted_wavelength, PAR_RANGE, side='left')
+    par_integration = sorted_radiation[par_start:par_end].sum()
     
-    # 蓝光积分 (400-500nm，不包括500) - 使用积分值
-    blue_integration = calculate_wavelength_range_integration(df_clean, integration_values, 400, 500)
+    # 植物光合敏感曲线P(λ)加权值 (McCree 1972)
+    plant_response_values = plant_photosynthetic_response(wavelength)
+    plant_weighted_integration = plant_response_values @ integration_values
     
-    # 绿光积分 (500-600nm，不包括600) - 使用积分值
-    green_integration = calculate_wavelength_range_integration(df_clean, integration_values, 500, 600)
-    
-    # 红光积分 (600-700nm，不包括700) - 使用积分值
-    red_integration = calculate_wavelength_range_integration(df_clean, integration_values, 600, 700)
-    
-    # 远红光积分 (700-800nm，不包括800) - 使用积分值
-    far_red_integration = calculate_wavelength_range_integration(df_clean, integration_values, 700, 800)
-    
-    # 新增光形态建成相关参数
-    # UV-A积分 (315-400nm) - 使用积分值
-    uva_integration = calculate_wavelength_range_integration(df_clean, integration_values, 315, 400)
-    
-    # UV-B积分 (280-315nm) - 使用积分值  
-    uvb_integration = calculate_wavelength_range_integration(df_clean, integration_values, 280, 315)
-    
-    # 紫光积分 (380-420nm) - 使用积分值
-    violet_integration = calculate_wavelength_range_integration(df_clean, integration_values, 380, 420)
-    
-    # 近红外积分 (700-850nm) - 使用积分值
-    nir_integration = calculate_wavelength_range_integration(df_clean, integration_values, 700, 850)
+    # 各波段积分保存在同一个连续数组中（按BAND_INDEX索引），同时展开为具名变量便于后续公式引用
+    band_edges = np.searchsorted(sorted_wavelength, SPECTRAL_BAND_LIMITS, side='left')
+    band_integrations = np.array([sorted_integration_values[start:end].sum() for start, end in band_edges])
+    (blue_integration, green_integration, red_integration, far_red_integration,
+     uva_integration, uvb_integration, violet_integration, nir_integration) = band_integrations
     
     # 5. 灯具光质总和积分（扩展版本）
-    light_quality_total = blue_integration + green_integration + red_integration + far_red_integration
-    extended_light_quality = uva_integration + violet_integration + blue_integration + green_integration + red_integration + far_red_integration + nir_integration
-    
-    # 6. 各颜色光占比计算（基于扩展光质总和）
-    blue_percentage = (blue_integration / extended_light_quality * 100) if extended_light_quality > 0 else 0
-    green_percentage = (green_integration / extended_light_quality * 100) if extended_light_quality > 0 else 0
-    red_percentage = (red_integration / extended_light_quality * 100) if extended_light_quality > 0 else 0
-    far_red_percentage = (far_red_integration / extended_light_quality * 100) if extended_light_quality > 0 else 0
+    light_quality_total = band_integrations[LIGHT_QUALITY_BANDS].sum()
+    extended_light_quality = band_integrations[EXTENDED_QUALITY_BANDS].sum()
     
-    # 新增光形态建成占比
-    uva_percentage = (uva_integration / extended_light_quality * 100) if extended_light_quality > 0 else 0
-    uvb_percentage = (uvb_integration / extended_light_quality * 100) if extended_light_quality > 0 else 0
-    violet_percentage = (violet_integration / extended_light_quality * 100) if extended_light_quality > 0 else 0
-    nir_percentage = (nir_integration / extended_light_quality * 100) if extended_light_quality > 0 else 0
+    # 6. 各颜色光占比计算（基于扩展光质总和），各波段一次性整体计算（含光形态建成相关波段）
+    if extended_light_quality > 0:
+        band_percentages = band_integrations / extended_light_quality * 100
+    else:
+        band_percentages = np.zeros_like(band_integrations)
+    (blue_percentage, green_percentage, red_percentage, far_red_percentage,
+     uva_percentage, uvb_percentage, violet_percentage, nir_percentage) = band_percentages
     
     # 7. 光效计算
-    luminous_efficacy = total_radiation_flux / total_power if total_power > 0 else 0
+    # 总功率与总积分的倒数只计算一次，后续指标统一乘以倒数（分母为0时倒数记为0）
+    has_power = total_power > 0
+    inv_power = 1.0 / total_power if has_power else 0.0
+    inv_total_integration = 1.0 / total_integration if total_integration > 0 else 0.0
+    luminous_efficacy = total_radiation_flux * inv_power
     
     # 8. 重新设计的计算指标
-    # 光能比 (光合有效积分/总积分)
-    light_energy_ratio = photosynthetic_active / total_integration if total_integration > 0 else 0
-    
-    # 总光子通量 (总辐射通量 × 光能比，单位: μmol/s)
-    total_photon_flux = total_radiation_flux * light_energy_ratio
-    
-    # PPE (总光子通量/总功率，单位: μmol/J)
-    ppe = total_photon_flux / total_power if total_power > 0 else 0
-    
-    # 保留原有的PAR占比计算
-    par_ratio = par_integration / total_integration if total_integration > 0 else 0
-    
-    # 保留原有的光质比例计算
-    # R/B (红光积分/蓝光积分)
-    r_b_ratio = red_integration / blue_integration if blue_integration > 0 else 0
-    
-    # R/Fr (红光积分/远红光积分)
-    r_fr_ratio = red_integration / far_red_integration if far_red_integration > 0 else 0
-    
-    # UV-A/B (UV-A积分/蓝光积分) - 移到光质比例指标
-    uva_b_ratio = uva_integration / blue_integration if blue_integration > 0 else 0
+    # 各比例指标按 (分子, 分母) 成对批量计算，分母为0时比例记为0
+    ratio_numerators = np.array([
+        photosynthetic_active,  # 光能比 (光合有效积分/总积分)
+        par_integration,        # PAR占比 (PAR积分/总积分)
+        red_integration,        # R/B (红光积分/蓝光积分)
+        red_integration,        # R/Fr (红光积分/远红光积分)
+        uva_integration,        # UV-A/B (UV-A积分/蓝光积分)
+        violet_integration,     # V/B (紫光积分/蓝光积分)
+        nir_integration         # NIR/R (近红外积分/红光积分)
+    ])
+    ratio_denominators = np.array([
+        total_integration, total_integration, blue_integration, far_red_integration,
+        blue_integration, blue_integration, red_integration
+    ])
+    ratios = np.zeros_like(ratio_numerators)
+    np.divide(ratio_numerators, ratio_denominators, out=ratios, where=ratio_denominators > 0)
+    light_energy_ratio, par_ratio, r_b_ratio, r_fr_ratio, uva_b_ratio, v_b_ratio, nir_r_ratio = ratios
     
     # 删除的比例参数
     # b_g_ratio = blue_integration / green_integration if green_integration > 0 else 0
     # g_r_ratio = green_integration / red_integration if red_integration > 0 else 0
     
-    # 保留的其他比例参数
-    v_b_ratio = violet_integration / blue_integration if blue_integration > 0 else 0
-    nir_r_ratio = nir_integration / red_integration if red_integration > 0 else 0
+    # 总光子通量 (总辐射通量 × 光能比，单位: μmol/s)
+    total_photon_flux = total_radiation_flux * light_energy_ratio
+    
+    # PPE (总光子通量/总功率，单位: μmol/J)
+    ppe = total_photon_flux * inv_power
     
     # PAR功率 (总辐射通量 × PAR占比，单位: W)
     par_power = total_radiation_flux * par_ratio
     
-    # 9. 植物光合敏感曲线P(λ)相关计算 (McCree 1972)
-    def plant_photosynthetic_response(wavelength):
-        """McCree (1972) 植物光合敏感曲线P(λ)"""
-        if wavelength < 400 or wavelength > 700:
-            return 0.0
-        elif wavelength <= 550:
-            # 蓝光区域峰值在430nm附近
-            return np.exp(-0.5 * ((wavelength - 430) / 40) ** 2) * 0.8 + \
-                   np.exp(-0.5 * ((wavelength - 470) / 30) ** 2) * 0.6
-        else:
-            # 红光区域峰值在630-680nm附近
-            return np.exp(-0.5 * ((wavelength - 630) / 35) ** 2) * 0.9 + \
-                   np.exp(-0.5 * ((wavelength - 670) / 25) ** 2) * 0.7
-    
-    # 计算植物光子度量学参数
-    plant_response_values = np.array([plant_photosynthetic_response(w) for w in wavelength])
-    plant_weighted_integration = np.sum(integration_values * plant_response_values)
-    plant_photon_efficacy = plant_weighted_integration / total_integration if total_integration > 0 else 0
+    # 9. 植物光子度量学参数 (McCree 1972)
+    plant_photon_efficacy = plant_weighted_integration * inv_total_integration
     
     # 10. 光谱质量评价参数
     # 数据有效性检查
@@ -1833,14 +1994,22 @@ def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_t
             # 光谱宽度计算 (半峰宽 FWHM)
             max_radiation_value = radiation[max_radiation_idx]
             half_max = max_radiation_value / 2
-            indices = np.where(radiation >= half_max)[0]
-            spectral_width = wavelength[indices[-1]] - wavelength[indices[0]] if len(indices) > 1 else 0
+            # 只需首尾两个超过半峰值的位置，直接在布尔数组上用argmax定位，不生成完整索引数组
+            above_half_max = radiation >= half_max
+            first_idx = int(above_half_max.argmax())
+            last_idx = len(above_half_max) - 1 - int(above_half_max[::-1].argmax())
+            # 峰值为负时可能没有任何点达到半峰值，此时argmax结果无意义
+            has_half_max = above_half_max[first_idx]
+            spectral_width = wavelength[last_idx] - wavelength[first_idx] if has_half_max and last_idx > first_idx else 0
+            
+            # 平均值只计算一次，供均匀性与饱和度指数共用
+            mean_radiation = radiation.mean()
             
             # 光谱均匀性指数 (标准差/平均值)
-            spectral_uniformity = np.std(radiation) / np.mean(radiation) if np.mean(radiation) > 0 else 0
+            spectral_uniformity = radiation.std() / mean_radiation if mean_radiation > 0 else 0
             
             # 色彩饱和度指数 (主峰值/平均值)  
-            color_saturation = max_radiation_value / np.mean(radiation) if np.mean(radiation) > 0 else 0
+            color_saturation = max_radiation_value / mean_radiation if mean_radiation > 0 else 0
         except (ValueError, IndexError) as e:
             # 出现异常时使用默认值
             peak_wavelength = 550
@@ -1854,305 +2023,97 @@ def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_t
     dli = total_photon_flux * 3600 * photoperiod_hours / 1000000  # mol/m²/d
     
     # 光饱和点达成率 (基于不同作物的典型光饱和点)
-    crop_light_saturation = {
-        '叶菜类': 300,    # μmol/m²/s
-        '果菜类': 800,    # μmol/m²/s  
-        '花卉类': 400,    # μmol/m²/s
-        '草本类': 200     # μmol/m²/s
-    }
-    
     # 假设PPFD为总光子通量值（简化计算）
     ppfd_estimated = total_photon_flux  
-    saturation_rates = {}
-    for crop_type, saturation_point in crop_light_saturation.items():
-        saturation_rate = min(ppfd_estimated / saturation_point, 1.0) if saturation_point > 0 else 0
-        saturation_rates[crop_type] = saturation_rate
+    saturation_values = np.minimum(ppfd_estimated / CROP_SATURATION_POINTS, 1.0)
+    saturation_rates = dict(zip(CROP_SATURATION_TYPES, saturation_values.tolist()))
     
     # 光补偿点评估 (一般植物光补偿点在5-20 μmol/m²/s)
     light_compensation_point = 15  # μmol/m²/s (平均值)
     compensation_multiple = ppfd_estimated / light_compensation_point if light_compensation_point > 0 else 0
     
-    # 光形态指数 (基于R/Fr比值)
-    if r_fr_ratio > 1.2:
-        morphology_index = "紧凑型"
-    elif r_fr_ratio > 0.8:
-        morphology_index = "正常型"
-    else:
-        morphology_index = "徒长型"
-    
     # 12. 扩展的植物生理响应评价指标
     
-    # 光形态建成相关指标
-    # Cryptochrome活性指数 (基于蓝光和UV-A)
-    crypto_activity = (blue_integration + uva_integration) / extended_light_quality if extended_light_quality > 0 else 0
-    
-    # Phytochrome活性指数 (基于红光和远红光)
-    phyto_activity = red_integration / (red_integration + far_red_integration) if (red_integration + far_red_integration) > 0 else 0
-    
-    # 花青素合成指数 (基于紫光和蓝光)
-    anthocyanin_index = (violet_integration + blue_integration) / extended_light_quality if extended_light_quality > 0 else 0
-    
-    # 叶绿素合成效率指数 (基于红蓝光比例)
-    chlorophyll_synthesis = (red_integration + blue_integration) / extended_light_quality if extended_light_quality > 0 else 0
-    
-    # 13. 不同作物类型的专业评价
-    crop_suitability = {}
-    
-    # 叶菜类作物评价 (适宜R/B: 0.5-1.5, 高蓝光需求)
-    leafy_score = 0
-    if 0.5 <= r_b_ratio <= 1.5:
-        leafy_score += 30
-    elif 0.3 <= r_b_ratio <= 2.0:
-        leafy_score += 20
-    else:
-        leafy_score += 10
-    
-    if blue_percentage > 20:
-        leafy_score += 25
-    elif blue_percentage > 15:
-        leafy_score += 15
-    else:
-        leafy_score += 5
-    
-    if green_percentage < 15:  # 绿光不宜过多
-        leafy_score += 20
-    else:
-        leafy_score += 10
-    
-    if par_ratio > 0.8:
-        leafy_score += 25
-    elif par_ratio > 0.6:
-        leafy_score += 15
-    else:
-        leafy_score += 5
-    
-    crop_suitability['叶菜类'] = min(leafy_score, 100)
-    
-    # 果菜类作物评价 (适宜R/B: 1.0-3.0, 高红光需求)
-    fruit_score = 0
-    if 1.0 <= r_b_ratio <= 3.0:
-        fruit_score += 30
-    elif 0.7 <= r_b_ratio <= 4.0:
-        fruit_score += 20
-    else:
-        fruit_score += 10
-    
-    if red_percentage > 35:
-        fruit_score += 25
-    elif red_percentage > 25:
-        fruit_score += 15
-    else:
-        fruit_score += 5
-    
-    if far_red_percentage > 5:  # 适量远红光促进开花
-        fruit_score += 20
-    else:
-        fruit_score += 10
-    
-    if par_ratio > 0.8:
-        fruit_score += 25
-    elif par_ratio > 0.6:
-        fruit_score += 15
-    else:
-        fruit_score += 5
-    
-    crop_suitability['果菜类'] = min(fruit_score, 100)
-    
-    # 育苗专用评价 (高蓝光，适中红光)
-    seedling_score = 0
-    if 0.3 <= r_b_ratio <= 1.0:
-        seedling_score += 30
-    elif 0.2 <= r_b_ratio <= 1.5:
-        seedling_score += 20
-    else:
-        seedling_score += 10
-    
-    if blue_percentage > 25:
-        seedling_score += 30
-    elif blue_percentage > 20:
-        seedling_score += 20
-    else:
-        seedling_score += 10
-    
-    if uva_b_ratio > 0.1:  # UV-A促进育苗
-        seedling_score += 20
-    else:
-        seedling_score += 10
-    
-    if ppe > 2.0:
-        seedling_score += 20
-    else:
-        seedling_score += 10
-    
-    crop_suitability['育苗专用'] = min(seedling_score, 100)
+    # 光形态建成相关指标，与第8步相同按 (分子, 分母) 成对批量计算，分母为0时记为0
+    physio_numerators = np.array([
+        blue_integration + uva_integration,     # Cryptochrome活性指数 (基于蓝光和UV-A)
+        red_integration,                        # Phytochrome活性指数 (基于红光和远红光)
+        violet_integration + blue_integration,  # 花青素合成指数 (基于紫光和蓝光)
+        red_integration + blue_integration      # 叶绿素合成效率指数 (基于红蓝光比例)
+    ])
+    physio_denominators = np.array([
+        extended_light_quality, red_integration + far_red_integration,
+        extended_light_quality, extended_light_quality
+    ])
+    physio_indices = np.zeros_like(physio_numerators)
+    np.divide(physio_numerators, physio_denominators, out=physio_indices, where=physio_denominators > 0)
+    crypto_activity, phyto_activity, anthocyanin_index, chlorophyll_synthesis = physio_indices
     
     # 14. 光谱质量综合评价
     # 光谱完整性指数 (各波段均匀度)
-    band_completeness = 0
-    total_bands = 8  # UV-B, UV-A, 紫, 蓝, 绿, 红, 远红, 近红外
-    
-    band_percentages = [
-        uvb_percentage, uva_percentage, violet_percentage, blue_percentage,
-        green_percentage, red_percentage, far_red_percentage, nir_percentage
-    ]
+    # 直接使用第6步得到的全部8个波段占比数组（顺序与SPECTRAL_BANDS一致）
+    total_bands = band_percentages.size
     
-    non_zero_bands = sum(1 for p in band_percentages if p > 1)  # 超过1%才算有效
+    non_zero_bands = int(np.count_nonzero(band_percentages > 1))  # 超过1%才算有效
     spectral_completeness = non_zero_bands / total_bands
     
     # 光谱平衡指数 (避免某一波段过度突出)
-    max_band_percentage = max(band_percentages)
+    max_band_percentage = band_percentages.max()
     spectral_balance = 1 - (max_band_percentage - 40) / 60 if max_band_percentage > 40 else 1
     spectral_balance = max(spectral_balance, 0)
     
     # 15. 能效与经济性扩展分析
     # 光能利用效率 (PAR输出功率/总功率)
-    light_energy_efficiency = par_power / total_power if total_power > 0 else 0
+    light_energy_efficiency = par_power * inv_power
     
     # 热损失率
-    heat_loss_rate = (total_power - total_radiation_flux) / total_power if total_power > 0 else 0
+    heat_loss_rate = (total_power - total_radiation_flux) * inv_power if has_power else 0
     
     # 单位面积成本效益 (假设照射面积1m²)
     illumination_area = 1.0  # m²
     ppfd_per_area = total_photon_flux / illumination_area  # μmol/m²/s
     
-    # 投资回报评估 (基于PPE和电费)
-    electricity_cost_per_kwh = 0.6  # 元/kWh
-    daily_electricity_cost = (total_power / 1000) * 12 * electricity_cost_per_kwh  # 元/天
+    # 投资回报评估 (基于PPE和电费，假设电费0.6元/kWh，按光周期每日运行)
+    # 运行成本与电费是同一组数值，只计算一次
+    daily_electricity_cost = (total_power / 1000) * photoperiod_hours * ELECTRICITY_RATE  # 元/天
     annual_electricity_cost = daily_electricity_cost * 365  # 元/年
     
     # 光效成本比 (PPE/每年电费，越高越好)
     efficiency_cost_ratio = ppe / (annual_electricity_cost / 100) if annual_electricity_cost > 0 else 0
     
-    # 16. 光谱优化建议
-    optimization_suggestions = []
-    
-    if ppe < 2.0:
-        optimization_suggestions.append("建议提高PPE：增加光合有效光子输出比例")
-    
-    if par_ratio < 0.6:
-        optimization_suggestions.append("建议优化光谱分布：提高PAR波段(400-700nm)比例")
-    
-    if r_b_ratio < 0.3:
-        optimization_suggestions.append("建议增加红光比例：当前红蓝比过低，可能影响植物伸长和开花")
-    elif r_b_ratio > 4.0:
-        optimization_suggestions.append("建议增加蓝光比例：当前红蓝比过高，可能导致徒长")
-    
-    if blue_percentage < 10:
-        optimization_suggestions.append("建议增加蓝光(400-500nm)：促进叶绿素合成和植物紧凑生长")
-    elif blue_percentage > 40:
-        optimization_suggestions.append("建议适当减少蓝光：过多蓝光可能抑制植物伸长")
-    
-    if green_percentage > 20:
-        optimization_suggestions.append("建议减少绿光(500-600nm)：绿光利用效率较低")
-    
-    if far_red_percentage < 2:
-        optimization_suggestions.append("建议添加少量远红光(700-800nm)：促进茎伸长和叶片展开")
-    elif far_red_percentage > 15:
-        optimization_suggestions.append("建议减少远红光：过多远红光可能导致徒长")
-    
-    if uva_percentage < 1:
-        optimization_suggestions.append("建议添加UV-A(315-400nm)：提高植物抗逆性和次生代谢物含量")
-    
-    if heat_loss_rate > 0.4:
-        optimization_suggestions.append("建议改善散热设计：当前热损失率较高，影响能效")
+    # 16. 光谱优化建议（按规则表依次判定）
+    rule_metrics = {
+        'ppe': ppe,
+        'par_ratio': par_ratio,
+        'r_b_ratio': r_b_ratio,
+        'blue_percentage': blue_percentage,
+        'green_percentage': green_percentage,
+        'far_red_percentage': far_red_percentage,
+        'uva_percentage': uva_percentage,
+        'heat_loss_rate': heat_loss_rate
+    }
+    optimization_suggestions = [message for condition, message in OPTIMIZATION_RULES if condition(rule_metrics)]
     
     if not optimization_suggestions:
-        optimization_suggestions.append("当前光谱配置较为合理，各项指标均在适宜范围内")
-    
-    # 17. 植物生长阶段适配性评价
-    growth_stage_suitability = {}
-    
-    # 发芽期适配性 (需要适量蓝光和红光)
-    germination_score = 50  # 基础分
-    if 15 <= blue_percentage <= 30:
-        germination_score += 20
-    if 25 <= red_percentage <= 45:
-        germination_score += 20
-    if ppe > 1.8:
-        germination_score += 10
-    growth_stage_suitability['发芽期'] = min(germination_score, 100)
-    
-    # 苗期适配性 (高蓝光，适中红光)
-    seedling_stage_score = 50
-    if blue_percentage > 25:
-        seedling_stage_score += 25
-    if 0.5 <= r_b_ratio <= 1.2:
-        seedling_stage_score += 20
-    if uva_percentage > 2:
-        seedling_stage_score += 5
-    growth_stage_suitability['苗期'] = min(seedling_stage_score, 100)
-    
-    # 营养生长期适配性 (平衡红蓝光)
-    vegetative_score = 50
-    if 1.0 <= r_b_ratio <= 2.0:
-        vegetative_score += 20
-    if par_ratio > 0.7:
-        vegetative_score += 15
-    if 10 <= green_percentage <= 15:
-        vegetative_score += 10
-    if far_red_percentage > 3:
-        vegetative_score += 5
-    growth_stage_suitability['营养生长期'] = min(vegetative_score, 100)
-    
-    # 开花期适配性 (高红光，少量远红光)
-    flowering_score = 50
-    if red_percentage > 35:
-        flowering_score += 20
-    if r_b_ratio > 2.0:
-        flowering_score += 15
-    if 5 <= far_red_percentage <= 12:
-        flowering_score += 10
-    if r_fr_ratio > 2.0:
-        flowering_score += 5
-    growth_stage_suitability['开花期'] = min(flowering_score, 100)
-    
-    # 结果期适配性 (均衡光谱，高光强)
-    fruiting_score = 50
-    if ppe > 2.2:
-        fruiting_score += 15
-    if par_ratio > 0.8:
-        fruiting_score += 15
-    if 1.5 <= r_b_ratio <= 3.0:
-        fruiting_score += 15
-    if spectral_completeness > 0.6:
-        fruiting_score += 5
-    growth_stage_suitability['结果期'] = min(fruiting_score, 100)
-    ppfd_per_watt = ppfd_estimated / total_power if total_power > 0 else 0
+        optimization_suggestions.append(DEFAULT_OPTIMIZATION_SUGGESTION)
+    
+    # 17. 作物适应性与植物生长阶段适配性评价
+    crop_suitability, growth_stage_suitability = calculate_suitability_scores(
+        r_b_ratio, r_fr_ratio, uva_b_ratio, par_ratio, ppe,
+        blue_percentage, green_percentage, red_percentage, far_red_percentage,
+        uva_percentage, spectral_completeness
+    )
+    ppfd_per_watt = ppfd_estimated * inv_power
     
     # 不同波段的光子效率
-    blue_photon_efficiency = blue_integration / total_integration if total_integration > 0 else 0
-    green_photon_efficiency = green_integration / total_integration if total_integration > 0 else 0  
-    red_photon_efficiency = red_integration / total_integration if total_integration > 0 else 0
+    blue_photon_efficiency = blue_integration * inv_total_integration
+    green_photon_efficiency = green_integration * inv_total_integration
+    red_photon_efficiency = red_integration * inv_total_integration
     
-    # 热辐射损失评估 (基于总功率和辐射通量差异)
-    thermal_loss_ratio = (total_power - total_radiation_flux) / total_power if total_power > 0 else 0
+    # 热辐射损失评估 (基于总功率和辐射通量差异，与热损失率相同)
+    thermal_loss_ratio = heat_loss_rate
     thermal_loss_percentage = thermal_loss_ratio * 100
     
-    # 运行成本估算 (假设电费0.6元/kWh，每日12小时)
-    daily_energy_consumption = total_power * photoperiod_hours / 1000  # kWh/day
-    electricity_rate = 0.6  # 元/kWh
-    daily_operating_cost = daily_energy_consumption * electricity_rate  # 元/day
-    monthly_operating_cost = daily_operating_cost * 30  # 元/month
-    annual_operating_cost = daily_operating_cost * 365  # 元/year
-    
-    # 光质评价 - 基于新的计算标准
-    def evaluate_light_quality(ppe_val, par_ratio_val, rb_ratio):
-        """基于新PPE标准的光质评价"""
-        # PPE评价标准 (μmol/J)
-        ppe_score = 3 if ppe_val > 2.5 else 2 if ppe_val > 2.0 else 1
-        par_score = 3 if par_ratio_val > 0.8 else 2 if par_ratio_val > 0.6 else 1
-        rb_score = 3 if 0.5 <= rb_ratio <= 3.0 else 2 if 0.3 <= rb_ratio <= 4.0 else 1
-        
-        total_score = ppe_score + par_score + rb_score
-        if total_score >= 8:
-            return "优秀", "🏆"
-        elif total_score >= 6:
-            return "良好", "👍"
-        else:
-            return "一般", "📈"
-    
-    quality_rating, quality_icon = evaluate_light_quality(ppe, par_ratio, r_b_ratio)
-    
     results = {
         'basic_info': {
             'lamp_model': lamp_model,
@@ -2230,18 +2191,13 @@ def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_t
             'dli': dli,
             'saturation_rates': saturation_rates,
             'compensation_multiple': compensation_multiple,
-            'morphology_index': morphology_index,
             'ppfd_estimated': ppfd_estimated,
             'ppfd_per_watt': ppfd_per_watt,
             'blue_photon_efficiency': blue_photon_efficiency,
             'green_photon_efficiency': green_photon_efficiency,
             'red_photon_efficiency': red_photon_efficiency,
             'thermal_loss_percentage': thermal_loss_percentage,
-            'daily_operating_cost': daily_operating_cost,
-            'monthly_operating_cost': monthly_operating_cost,
-            'annual_operating_cost': annual_operating_cost,
-            'quality_rating': quality_rating,
-            'quality_icon': quality_icon
+            'annual_operating_cost': annual_electricity_cost
         },
         'percentages': {
             'blue_percentage': blue_percentage,
@@ -2257,9 +2213,678 @@ def calculate_light_analysis(df, total_radiation_flux, total_power, back_panel_t
     
     return results, df_clean
 
+def evaluate_light_quality(ppe_val, par_ratio_val, rb_ratio):
+    """基于新PPE标准的光质评价"""
+    # PPE评价标准 (μmol/J)
+    ppe_score = 1 + int(np.searchsorted(PPE_RATING_THRESHOLDS, ppe_val))
+    par_score = 1 + int(np.searchsorted(PAR_RATING_THRESHOLDS, par_ratio_val))
+    rb_score = score_by_thresholds(rb_ratio, *RB_QUALITY_RULE)
+    
+    total_score = ppe_score + par_score + rb_score
+    level = int(np.searchsorted(QUALITY_SCORE_THRESHOLDS, total_score, side='right'))
+    return RATING_LABELS[level], QUALITY_ICONS[level]
+
+def format_display_fields(results):
+    """计算仅用于界面展示和报告输出的派生字段（评级、图标、形态类型、日/月运行成本）"""
+    calculations = results.get('calculations', {})
+    
+    # 光质评价 - 基于新的计算标准
+    quality_rating, quality_icon = evaluate_light_quality(
+        calculations.get('ppe', 0), calculations.get('par_ratio', 0), calculations.get('r_b_ratio', 0)
+    )
+    
+    r_fr_ratio = calculations.get('r_fr_ratio', 0)
+    # 光形态指数 (基于R/Fr比值)
+    morphology_index = classify_by_thresholds(r_fr_ratio, MORPHOLOGY_THRESHOLDS, MORPHOLOGY_LABELS)
+    
+    # 运行成本由年度运行成本折算
+    daily_operating_cost = calculations.get('annual_operating_cost', 0) / 365  # 元/day
+    monthly_operating_cost = daily_operating_cost * 30  # 元/month
+    
+    return {
+        'quality_rating': quality_rating,
+        'quality_icon': quality_icon,
+        'morphology_index': morphology_index,
+        'daily_operating_cost': daily_operating_cost,
+        'monthly_operating_cost': monthly_operating_cost
+    }
+
+# 光谱质量雷达图维度
+SPECTRAL_QUALITY_CATEGORIES = ['完整性', '平衡性', 'PAR占比', 'PPE性能', '红蓝比适宜度']
+
+def calculate_spectral_quality_scores(calculations):
+    """计算光谱质量雷达图各维度得分（0-1标准化）"""
+    completeness_score = calculations['spectral_completeness']
+    balance_score = calculations['spectral_balance']
+    par_score = min(calculations['par_ratio'] / 0.9, 1.0)  # 以0.9为满分
+    ppe_score = min(calculations['ppe'] / 3.0, 1.0)  # 以3.0为满分
+    rb_score = 1.0 if 0.5 <= calculations['r_b_ratio'] <= 3.0 else 0.5
+    
+    return [completeness_score, balance_score, par_score, ppe_score, rb_score]
+
+@st.cache_data(show_spinner=False)
+def build_sample_csv():
+    """生成示例光谱数据的CSV文本（380-780nm，每5nm一个点）"""
+    sample_wavelengths = np.arange(380, 781, 5)
+    
+    # 模拟一个典型的LED光谱（蓝红双峰）
+    blue_peak = np.exp(-0.5 * ((sample_wavelengths - 450) / 25) ** 2) * 0.8
+    red_peak = np.exp(-0.5 * ((sample_wavelengths - 660) / 30) ** 2) * 1.0
+    green_component = np.exp(-0.5 * ((sample_wavelengths - 520) / 40) ** 2) * 0.2
+    noise = np.random.normal(0, 0.02, sample_wavelengths.size)
+    sample_radiations = np.maximum(blue_peak + red_peak + green_component + noise, 0)  # 确保非负值
+    
+    sample_df = pd.DataFrame({
+        '波长(nm)': sample_wavelengths,
+        '辐射强度': sample_radiations
+    })
+    
+    # 转换为CSV格式供下载
+    return sample_df.to_csv(index=False)
+
+@st.cache_data(show_spinner=False)
+def build_response_curves():
+    """生成380-780nm的植物光合敏感曲线与人眼视见函数V(λ)近似曲线，仅计算一次"""
+    wavelength_range = np.arange(380, 780, 1)
+    
+    # 用于可视化的植物光合敏感曲线，与计算时使用同一条向量化的McCree曲线
+    plant_response_curve = plant_photosynthetic_response(wavelength_range)
+    
+    # 人眼视见函数V(λ)近似（取值范围均在380-780nm之内）
+    human_response_curve = np.exp(-0.5 * ((wavelength_range - 555) / 100) ** 2)
+    
+    return wavelength_range, plant_response_curve, human_response_curve
+
+@st.cache_data(show_spinner=False)
+def build_light_quality_pie(values):
+    """创建光质分布占比饼图，按(蓝, 绿, 红, 远红)占比元组缓存"""
+    colors = ['#4285F4', '#34A853', '#EA4335', "#FB04DA"]  # 蓝、绿、红、远红
+    labels = ['蓝光 (400-500nm)', '绿光 (500-600nm)', '红光 (600-700nm)', '远红光 (700-800nm)']
+    
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=labels, 
+        values=values,
+        marker_colors=colors,
+        textinfo='label+percent',
+        textfont_size=12
+    )])
+    
+    fig_pie.update_layout(
+        title="光质分布占比",
+        font=dict(size=14),
+        height=500
+    )
+    
+    return fig_pie
+
+@st.cache_data(show_spinner=False)
+def build_spectrum_figure(wavelengths, radiations, fast_mode=False):
+    """创建彩虹色谱填充的光谱分布图，按波长和辐射数组缓存；快速模式下仅绘制单色填充曲线"""
+    fig_spectrum = go.Figure()
+    
+    # 按波长排序一次，供分段填充和波段标注用二分查找定位区间
+    order = np.argsort(wavelengths, kind='stable')
+    sorted_waves = wavelengths[order]
+    sorted_rads = radiations[order]
+    
+    # 高分辨率光谱用LTTB降采样后再绘制，波段标注仍基于完整数据；
+    # 绘图数据降为float32，减半传给前端的序列化数据量
+    plot_waves, plot_rads = sorted_waves, sorted_rads
+    if len(plot_waves) > CHART_DOWNSAMPLE_THRESHOLD:
+        plot_waves, plot_rads = lttb_downsample(plot_waves, plot_rads, CHART_TARGET_POINTS)
+    plot_waves = plot_waves.astype(np.float32)
+    plot_rads = plot_rads.astype(np.float32)
+    
+    try:
+        # 按小段创建填充，每段使用对应的光谱颜色
+        step = 5  # 每5nm一个颜色段
+        min_wave = int(wavelengths.min())
+        max_wave = int(wavelengths.max())
+        
+        # 检查波长范围是否合理
+        if min_wave >= max_wave or max_wave - min_wave < 10:
+            st.warning("波长数据范围异常，使用简化显示")
+            # 使用简化的图表
+            fig_spectrum = go.Figure()
+            fig_spectrum.add_trace(go.Scattergl(
+                x=plot_waves,
+                y=plot_rads,
+                mode='lines+markers',
+                name='光谱强度',
+                line=dict(color='blue', width=2)
+            ))
+        elif fast_mode or len(wavelengths) < FAST_RENDER_MAX_POINTS:
+            # 快速渲染或数据点过少时，彩色分段填充没有可见收益，只绘制带浅灰填充的轮廓
+            fig_spectrum.add_trace(go.Scattergl(
+                x=plot_waves,
+                y=plot_rads,
+                fill='tozeroy',
+                fillcolor='rgba(128, 128, 128, 0.2)',
+                mode='lines',
+                name='光谱强度',
+                line=dict(color='black', width=2)
+            ))
+        else:
+            fig_spectrum = go.Figure()
+            
+            # 一次性计算所有色段的起止波长及其中心波长对应的颜色
+            segment_starts = np.arange(min_wave, max_wave, step)
+            segment_ends = np.minimum(segment_starts + step, max_wave)
+            segment_centers = (segment_starts + segment_ends) / 2
+            segment_rgb = (wavelength_to_rgb(segment_centers) * 255).astype(np.uint8)
+            segment_colors = [f'rgba({r}, {g}, {b}, 0.7)' for r, g, b in segment_rgb.tolist()]
+            
+            try:
+                # 使用单条带水平渐变填充的曲线代替逐段填充，图表轨迹数由O(N/step)降为O(1)
+                positions = (segment_centers - min_wave) / (max_wave - min_wave)
+                colorscale = [[pos, color] for pos, color in zip(positions.tolist(), segment_colors)]
+                if len(colorscale) == 1:
+                    colorscale = [[0.0, colorscale[0][1]], [1.0, colorscale[0][1]]]
+                else:
+                    colorscale[0][0], colorscale[-1][0] = 0.0, 1.0
+                
+                fig_spectrum.add_trace(go.Scatter(
+                    x=plot_waves,
+                    y=plot_rads,
+                    fill='tozeroy',
+                    fillgradient=dict(type='horizontal', colorscale=colorscale),
+                    line=dict(width=0),
+                    mode='lines',
+                    showlegend=False,
+                    hoverinfo='skip'
+                ))
+            except ValueError:
+                # 旧版Plotly (<5.19) 不支持fillgradient，退回逐段填充
+                # 用二分查找一次性求出每段的起止下标
+                start_indices = np.searchsorted(sorted_waves, segment_starts, side='left')
+                end_indices = np.searchsorted(sorted_waves, segment_ends, side='left')
+                for wave_start, wave_end, start_idx, end_idx, color in zip(
+                        segment_starts, segment_ends, start_indices, end_indices, segment_colors):
+                    if end_idx > start_idx:
+                        range_waves = sorted_waves[start_idx:end_idx]
+                        range_rads = sorted_rads[start_idx:end_idx]
+                        
+                        # 创建填充区域
+                        x_fill = np.concatenate(([wave_start], range_waves, [wave_end]))
+                        y_fill = np.concatenate(([0.0], range_rads, [0.0]))
+                        
+                        fig_spectrum.add_trace(go.Scatter(
+                            x=x_fill,
+                            y=y_fill,
+                            fill='tozeroy',
+                            fillcolor=color,
+                            line=dict(color=color, width=0),
+                            mode='lines',
+                            showlegend=False,
+                            hoverinfo='skip'
+                        ))
+            
+            # 添加整体光谱线条作为轮廓
+            fig_spectrum.add_trace(go.Scattergl(
+                x=plot_waves,
+                y=plot_rads,
+                mode='lines',
+                name='光谱强度',
+                line=dict(color='black', width=2),
+                opacity=0.8
+            ))
+    
+    except Exception as e:
+        st.error(f"生成光谱分布图时出错: {str(e)}")
+        # 使用简化的图表作为后备
+        fig_spectrum = go.Figure()
+        fig_spectrum.add_trace(go.Scattergl(
+            x=plot_waves,
+            y=plot_rads,
+            mode='lines+markers',
+            name='光谱强度',
+            line=dict(color='blue', width=2)
+        ))
+    
+    # 波长范围标注先收集为列表，随布局一次性设置
+    range_edges = np.searchsorted(sorted_waves, WAVELENGTH_RANGE_LIMITS, side='left')
+    band_annotations = [
+        dict(
+            x=(min_wave + max_wave) / 2,
+            y=sorted_rads[start_idx:end_idx].max() * 1.1,
+            text=label,
+            showarrow=False,
+            font=dict(size=12, color='black'),
+            bgcolor='rgba(255, 255, 255, 0.8)',
+            bordercolor='black',
+            borderwidth=1
+        )
+        for (min_wave, max_wave, label, _), (start_idx, end_idx) in zip(WAVELENGTH_RANGES, range_edges)
+        if end_idx > start_idx
+    ]
+    
+    fig_spectrum.update_layout(
+        annotations=band_annotations,
+        title="LED光谱分布 (彩虹色谱)",
+        hovermode='x',
+        spikedistance=0,
+        xaxis_title="波长 (nm)",
+        yaxis_title="辐射强度",
+        height=500,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom", 
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor='white'
+    )
+    
+    return fig_spectrum
+
+@st.cache_data(show_spinner=False)
+def build_comparison_figure(wavelengths, radiations):
+    """创建植物光合敏感曲线、人眼视见函数与归一化测试光谱的对比图"""
+    # 生成植物光合敏感曲线数据
+    wavelength_range, plant_response_curve, human_response_curve = build_response_curves()
+    
+    fig_comparison = go.Figure()
+    
+    # 植物光合敏感曲线
+    fig_comparison.add_trace(go.Scattergl(
+        x=wavelength_range,
+        y=plant_response_curve,
+        mode='lines',
+        name='植物光合敏感曲线 P(λ)',
+        line=dict(color='#2E8B57', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(46, 139, 87, 0.3)'
+    ))
+    
+    # 人眼视见函数
+    fig_comparison.add_trace(go.Scattergl(
+        x=wavelength_range,
+        y=human_response_curve,
+        mode='lines',
+        name='人眼视见函数 V(λ)',
+        line=dict(color='#FF6347', width=3, dash='dash'),
+        fill='tozeroy',
+        fillcolor='rgba(255, 99, 71, 0.2)'
+    ))
+    
+    # 添加实际光谱数据（归一化）
+    if len(radiations) > 0:
+        plot_waves, plot_rads = wavelengths, radiations
+        if len(plot_waves) > CHART_DOWNSAMPLE_THRESHOLD:
+            order = np.argsort(wavelengths, kind='stable')
+            plot_waves, plot_rads = lttb_downsample(wavelengths[order], radiations[order], CHART_TARGET_POINTS)
+        normalized_spectrum = (plot_rads / radiations.max()).astype(np.float32)
+        fig_comparison.add_trace(go.Scattergl(
+            x=plot_waves.astype(np.float32),
+            y=normalized_spectrum,
+            mode='lines',
+            name='测试光谱 (归一化)',
+            line=dict(color='#4169E1', width=2),
+            opacity=0.8
+        ))
+    
+    fig_comparison.update_layout(
+        title="光学度量体系对比分析",
+        hovermode='x',
+        spikedistance=0,
+        xaxis_title="波长 (nm)",
+        yaxis_title="相对响应",
+        height=400,
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        plot_bgcolor='white'
+    )
+    
+    # 添加重要波长标注：竖线与顶部文字各自收集为列表，一次性写入布局（与add_vline生成的形状和标注一致）
+    fig_comparison.update_layout(
+        shapes=[
+            dict(type='line', x0=wl, x1=wl, xref='x', y0=0, y1=1, yref='y domain',
+                 line=dict(color=color, dash='dot'))
+            for wl, _, color in IMPORTANT_WAVELENGTHS
+        ],
+        annotations=[
+            dict(x=wl, xref='x', xanchor='center', y=1, yref='y domain', yanchor='bottom',
+                 text=f"{label}\n{wl}nm", showarrow=False)
+            for wl, label, _ in IMPORTANT_WAVELENGTHS
+        ]
+    )
+    
+    return fig_comparison
+
+@st.cache_data(show_spinner=False)
+def build_result_tables(calculations, percentages):
+    """创建度量体系对比、性能指标和光谱积分三张结果表格（各列均为已格式化的字符串，直接按object类型构建）"""
+    comparison_data = {
+        "度量体系": [
+            "辐射度学", "光度学", "光子度量学", "植物光子度量学"
+        ],
+        "核心参数": [
+            f"{calculations['total_integration']:.2f}",
+            "基于人眼V(λ)",
+            f"{calculations['ppe']:.3f} μmol/J",
+            f"{calculations['plant_photon_efficacy']:.3f}"
+        ],
+        "适用场景": [
+            "能量评价", "人因照明", "植物照明标准", "精准植物照明"
+        ]
+    }
+    comparison_df = pd.DataFrame(comparison_data, dtype=object)
+    
+    performance_data = {
+        "指标": [
+            "PPE (新标准)", "总光子通量", "PAR占比", "光能比", 
+            "R/B比", "R/Fr比", "PAR功率", "光效"
+        ],
+        "数值": [
+            f"{calculations['ppe']:.3f} μmol/J",
+            f"{calculations['total_photon_flux']:.2f} μmol/s",
+            f"{calculations['par_ratio']:.3f}",
+            f"{calculations['light_energy_ratio']:.3f}",
+            f"{calculations['r_b_ratio']:.2f}",
+            f"{calculations['r_fr_ratio']:.2f}",
+            f"{calculations['par_power']:.2f} W",
+            f"{calculations['luminous_efficacy']:.3f} W/W"
+        ],
+        "说明": [
+            "总光子通量/总功率",
+            "总辐射通量×光能比",
+            "光合有效辐射比例",
+            "光合有效积分/总积分",
+            "红蓝光比例",
+            "红远红光比例",
+            "PAR波段功率",
+            "辐射光效"
+        ]
+    }
+    performance_df = pd.DataFrame(performance_data, dtype=object)
+    
+    spectrum_data = {
+        "波段": [
+            "光合有效积分", "总积分", "PAR积分 (400-700nm)",
+            "蓝光积分 (400-500nm)", "绿光积分 (500-600nm)",
+            "红光积分 (600-700nm)", "远红光积分 (700-800nm)",
+            "光质总和积分"
+        ],
+        "数值": [
+            f"{calculations['photosynthetic_active']:.2f}",
+            f"{calculations['total_integration']:.2f}",
+            f"{calculations['par_integration']:.2f}",
+            f"{calculations['blue_integration']:.2f}",
+            f"{calculations['green_integration']:.2f}",
+            f"{calculations['red_integration']:.2f}",
+            f"{calculations['far_red_integration']:.2f}",
+            f"{calculations['light_quality_total']:.2f}"
+        ],
+        "占比 (%)": [
+            "-", "-", f"{calculations['par_ratio']*100:.1f}%",
+            f"{percentages['blue_percentage']:.1f}%",
+            f"{percentages['green_percentage']:.1f}%",
+            f"{percentages['red_percentage']:.1f}%",
+            f"{percentages['far_red_percentage']:.1f}%",
+            "100.0%"
+        ]
+    }
+    spectrum_df = pd.DataFrame(spectrum_data, dtype=object)
+    
+    return comparison_df, performance_df, spectrum_df
+
+@st.cache_data(show_spinner=False)
+def build_growth_stage_figure(stage_names, stage_scores):
+    """创建生长阶段适配性柱状图，按(阶段名, 评分)元组缓存"""
+    fig_stages = go.Figure(data=[
+        go.Bar(
+            x=stage_names, 
+            y=stage_scores,
+            marker_color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7'],
+            text=[f'{score}分' for score in stage_scores],
+            textposition='auto'
+        )
+    ])
+    
+    fig_stages.update_layout(
+        title="不同生长阶段适配性评分",
+        xaxis_title="生长阶段",
+        yaxis_title="适配性评分",
+        height=400,
+        yaxis=dict(range=[0, 100])
+    )
+    
+    return fig_stages
+
+@st.cache_data(show_spinner=False)
+def build_spectral_quality_radar(scores):
+    """创建光谱质量雷达图，按各维度得分元组缓存"""
+    fig_radar = go.Figure()
+    
+    fig_radar.add_trace(go.Scatterpolar(
+        r=scores,
+        theta=SPECTRAL_QUALITY_CATEGORIES,
+        fill='toself',
+        name='当前光谱',
+        fillcolor='rgba(0, 123, 255, 0.3)',
+        line_color='rgba(0, 123, 255, 1)'
+    ))
+    
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 1]
+            )),
+        showlegend=True,
+        title="光谱质量雷达图",
+        height=400
+    )
+    
+    return fig_radar
+
+def display_results_batch(results_list):
+    """多灯具对比显示：所有灯具汇总为一个表格，每张图表只创建一次"""
+    
+    st.markdown("---")
+    st.header("🔬 多灯具对比分析")
+    
+    lamp_names = [r['basic_info']['lamp_model'] for r in results_list]
+    calculations_df = pd.DataFrame([r['calculations'] for r in results_list])
+    
+    comparison_df = pd.DataFrame({
+        "灯具": lamp_names,
+        "综合评级": [format_display_fields(r)['quality_rating'] for r in results_list],
+        "PPE (μmol/J)": calculations_df['ppe'].round(3),
+        "总光子通量 (μmol/s)": calculations_df['total_photon_flux'].round(2),
+        "PAR占比": (calculations_df['par_ratio'] * 100).round(1).astype(str) + "%",
+        "光能比": calculations_df['light_energy_ratio'].round(3),
+        "R/B比": calculations_df['r_b_ratio'].round(2),
+        "R/Fr比": calculations_df['r_fr_ratio'].round(2)
+    })
+    st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # 所有灯具的PPE放在同一条柱状轨迹中
+        fig_ppe = go.Figure(data=[
+            go.Bar(
+                x=lamp_names,
+                y=calculations_df['ppe'],
+                name='PPE',
+                text=[f'{ppe:.3f}' for ppe in calculations_df['ppe']],
+                textposition='auto'
+            )
+        ])
+        fig_ppe.update_layout(
+            title="PPE对比",
+            xaxis_title="灯具",
+            yaxis_title="PPE (μmol/J)",
+            height=400
+        )
+        st.plotly_chart(fig_ppe, use_container_width=True)
+    
+    with col2:
+        # 每个灯具一条雷达轨迹，共用同一组维度
+        fig_radar = go.Figure()
+        for lamp_name, results in zip(lamp_names, results_list):
+            fig_radar.add_trace(go.Scatterpolar(
+                r=calculate_spectral_quality_scores(results['calculations']),
+                theta=SPECTRAL_QUALITY_CATEGORIES,
+                fill='toself',
+                name=lamp_name
+            ))
+        fig_radar.update_layout(
+            polar=dict(radialaxis=dict(visible=True, range=[0, 1])),
+            showlegend=True,
+            title="光谱质量雷达图对比",
+            height=400
+        )
+        st.plotly_chart(fig_radar, use_container_width=True)
+
+@st_fragment
+def render_spectrum_panel(wavelengths, radiations):
+    """光谱分布图片段：切换快速渲染模式时只重跑本图表，不重跑整个结果页"""
+    fast_mode = st.checkbox("⚡ 快速渲染模式", value=False, help="跳过彩虹色谱填充，仅绘制光谱轮廓")
+    
+    # 创建连续的彩虹填充效果
+    fig_spectrum = build_spectrum_figure(wavelengths, radiations, fast_mode)
+    
+    st.plotly_chart(fig_spectrum, use_container_width=True, config=DENSE_PLOT_CONFIG)
+
+@st_fragment
+def render_report_panel(results, df):
+    """报告生成与下载片段：点击生成按钮时只重跑本区域，不重建页面上的其余图表"""
+    # 生成报告内容（仅在用户点击生成按钮时才渲染PDF，结果保存在会话中供下载）
+    if PDF_AVAILABLE:
+        mime_type = "application/pdf"
+        file_ext = ".pdf"
+        
+        # 生成文件名（包含灯具型号和日期）
+        lamp_model = results.get('basic_info', {}).get('lamp_model', 'Unknown')
+        test_date = results.get('basic_info', {}).get('test_date', 'Unknown')
+        
+        if lamp_model and lamp_model != '未填写' and lamp_model.strip():
+            # 清理文件名中的特殊字符
+            clean_model = FILENAME_UNSAFE_CHARS.sub('', lamp_model).strip()
+            filename = f"LED光谱分析报告_{clean_model}_{test_date}{file_ext}"
+        else:
+            filename = f"LED光谱分析报告_{test_date}{file_ext}"
+        
+        # 以输入参数和光谱数据标识报告，参数或数据变化后旧报告失效
+        report_signature = (
+            repr(results.get('basic_info')),
+            repr(results.get('input_params')),
+            hash(df['wavelength'].to_numpy().tobytes()),
+            hash(df['radiation'].to_numpy().tobytes())
+        )
+        pdf_report = st.session_state.get('pdf_report')
+        if pdf_report is not None and pdf_report['signature'] != report_signature:
+            pdf_report = None
+        
+        if st.button("📄 生成PDF报告", use_container_width=True):
+            try:
+                with st.spinner("正在生成PDF报告..."):
+                    report_data = generate_pdf_report(results, df)
+                pdf_report = {'signature': report_signature, 'data': report_data}
+                st.session_state['pdf_report'] = pdf_report
+                st.success("✅ PDF报告生成成功！")
+                
+            except Exception as e:
+                st.error(f"❌ PDF报告生成失败：{str(e)}")
+                st.info("💡 请确保分析数据完整后重试")
+                # 显示详细错误信息用于调试
+                with st.expander("显示详细错误信息"):
+                    st.exception(e)
+        
+        if pdf_report is not None:
+            st.download_button(
+                label="📥 下载完整分析报告 (PDF)",
+                data=pdf_report['data'],
+                file_name=filename,
+                mime=mime_type,
+                help="点击下载包含所有图表和分析数据的PDF报告",
+                use_container_width=True
+            )
+            
+            st.info("📊 报告包含完整图表和专业分析数据")
+    else:
+        # PDF库不可用时的处理
+        st.error("❌ PDF生成功能不可用")
+        
+        # 检查运行环境并给出相应建议
+        st.markdown("**💡 解决方案：**")
+        
+        with st.expander("🔧 在Streamlit Cloud上部署", expanded=True):
+            st.markdown("""
+            如果您在Streamlit Cloud上运行此应用，请确保您的GitHub仓库包含正确的 `requirements.txt` 文件：
+            
+            ```
+            streamlit>=1.28.0
+            pandas>=1.5.0
+            numpy>=1.21.0
+            plotly>=5.15.0
+            matplotlib>=3.7.0
+            seaborn>=0.12.0
+            reportlab>=4.0.0
+            Pillow>=10.0.0
+            openpyxl>=3.0.0
+            ```
+            
+            **部署步骤：**
+            1. 在您的GitHub仓库根目录创建/更新 `requirements.txt` 文件
+            2. 将上述内容添加到文件中
+            3. 提交并推送更改到GitHub
+            4. 在Streamlit Cloud中重新部署应用
+            5. 等待依赖库安装完成（通常需要几分钟）
+            """)
+        
+        with st.expander("💻 本地运行"):
+            st.markdown("""
+            如果您在本地运行此应用，请在终端中执行：
+            ```bash
+            pip install matplotlib seaborn reportlab Pillow
+            ```
+            然后重启应用。
+            """)
+        
+        st.markdown("**📄 临时解决方案：**")
+        st.info("当前将为您生成简化版HTML报告，包含主要分析数据但不含图表。")
+        
+        try:
+            report_data = generate_simplified_report(results, df)
+            mime_type = "text/html"
+            file_ext = ".html"
+            
+            # 生成文件名
+            lamp_model = results.get('basic_info', {}).get('lamp_model', 'Unknown')
+            test_date = results.get('basic_info', {}).get('test_date', 'Unknown')
+            
+            if lamp_model and lamp_model != '未填写' and lamp_model.strip():
+                clean_model = FILENAME_UNSAFE_CHARS.sub('', lamp_model).strip()
+                filename = f"LED光谱分析报告_{clean_model}_{test_date}{file_ext}"
+            else:
+                filename = f"LED光谱分析报告_{test_date}{file_ext}"
+            
+            st.download_button(
+                label="📥 下载简化分析报告 (HTML)",
+                data=report_data,
+                file_name=filename,
+                mime=mime_type,
+                help="下载包含主要分析数据的HTML报告（不含图表）",
+                use_container_width=True
+            )
+            
+            st.warning("⚠️ 当前为简化版HTML报告（不含图表）")
+            
+        except Exception as e:
+            st.error(f"❌ 报告生成失败：{str(e)}")
+            if st.checkbox("显示详细错误信息"):
+                st.exception(e)
+
 def display_results(results, df):
     """显示分析结果"""
     
+    display_fields = format_display_fields(results)
+    
     st.markdown("---")
     st.header("🔬 分析结果")
     
@@ -2270,88 +2895,42 @@ def display_results(results, df):
     basic_info = results.get('basic_info', {})
     if any(basic_info.values()):
         st.markdown("##### 📋 基本信息")
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            lamp_model = basic_info.get('lamp_model', '未填写')
-            st.markdown(f"""
-            <div style='background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%); 
-                        padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
-                <h4>🏷️ 灯具型号</h4>
-                <h3>{lamp_model}</h3>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            manufacturer = basic_info.get('manufacturer', '未填写')
-            st.markdown(f"""
-            <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                        padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
-                <h4>🏢 制造商/单位</h4>
-                <h3>{manufacturer}</h3>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            test_date = basic_info.get('test_date', '未填写')
-            st.markdown(f"""
-            <div style='background: linear-gradient(135deg, #fa709a 0%, #fee140 100%); 
-                        padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
-                <h4>📅 测试日期</h4>
-                <h3>{test_date}</h3>
-            </div>
-            """, unsafe_allow_html=True)
+        basic_cards = (
+            ('🏷️ 灯具型号', basic_info.get('lamp_model', '未填写'), ('#11998e', '#38ef7d')),
+            ('🏢 制造商/单位', basic_info.get('manufacturer', '未填写'), ('#667eea', '#764ba2')),
+            ('📅 测试日期', basic_info.get('test_date', '未填写'), ('#fa709a', '#fee140'))
+        )
+        for col, (title, value, (start_color, end_color)) in zip(st.columns(3), basic_cards):
+            col.markdown(GRADIENT_CARD_TEMPLATE.format(
+                start_color=start_color, end_color=end_color,
+                title_tag='h4', title=title, value_tag='h3', value=value
+            ), unsafe_allow_html=True)
     
     st.markdown("##### ⚡ 电气参数")
     # 使用卡片式布局
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
-            <h3>🔆 总辐射通量</h3>
-            <h2>{results['input_params']['total_radiation_flux']:.1f} W</h2>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
-                    padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
-            <h3>⚡ 总功率</h3>
-            <h2>{results['input_params']['total_power']:.1f} W</h2>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); 
-                    padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
-            <h3>🌡️ 后面板温度</h3>
-            <h2>{results['input_params']['back_panel_temp']:.1f} ℃</h2>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%); 
-                    padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
-            <h3>🔋 功率因数</h3>
-            <h2>{results['input_params']['power_factor']:.3f}</h2>
-        </div>
-        """, unsafe_allow_html=True)
+    input_params = results['input_params']
+    electrical_cards = (
+        ('🔆 总辐射通量', f"{input_params['total_radiation_flux']:.1f} W", ('#667eea', '#764ba2')),
+        ('⚡ 总功率', f"{input_params['total_power']:.1f} W", ('#f093fb', '#f5576c')),
+        ('🌡️ 后面板温度', f"{input_params['back_panel_temp']:.1f} ℃", ('#4facfe', '#00f2fe')),
+        ('🔋 功率因数', f"{input_params['power_factor']:.3f}", ('#43e97b', '#38f9d7'))
+    )
+    for col, (title, value, (start_color, end_color)) in zip(st.columns(4), electrical_cards):
+        col.markdown(GRADIENT_CARD_TEMPLATE.format(
+            start_color=start_color, end_color=end_color,
+            title_tag='h3', title=title, value_tag='h2', value=value
+        ), unsafe_allow_html=True)
     
     st.markdown("---")
     
     # 综合评价卡片 - 移到顶部
-    st.subheader(f"🏆 综合评价: {results['calculations']['quality_rating']} {results['calculations']['quality_icon']}")
+    st.subheader(f"🏆 综合评价: {display_fields['quality_rating']} {display_fields['quality_icon']}")
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        ppe_rating = "优秀" if results['calculations']['ppe'] > 2.5 else "良好" if results['calculations']['ppe'] > 2.0 else "一般"
-        color = "#28a745" if ppe_rating == "优秀" else "#ffc107" if ppe_rating == "良好" else "#dc3545"
+        ppe_rating = classify_by_thresholds(results['calculations']['ppe'], PPE_RATING_THRESHOLDS, RATING_LABELS)
+        color = classify_by_thresholds(results['calculations']['ppe'], PPE_RATING_THRESHOLDS, RATING_COLORS)
         st.markdown(f"""
         <div style='background: {color}; padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
             <h4>⚡ PPE评价: {ppe_rating}</h4>
@@ -2361,8 +2940,8 @@ def display_results(results, df):
         """, unsafe_allow_html=True)
     
     with col2:
-        par_rating = "优秀" if results['calculations']['par_ratio'] > 0.8 else "良好" if results['calculations']['par_ratio'] > 0.6 else "一般"
-        color = "#28a745" if par_rating == "优秀" else "#ffc107" if par_rating == "良好" else "#dc3545"
+        par_rating = classify_by_thresholds(results['calculations']['par_ratio'], PAR_RATING_THRESHOLDS, RATING_LABELS)
+        color = classify_by_thresholds(results['calculations']['par_ratio'], PAR_RATING_THRESHOLDS, RATING_COLORS)
         st.markdown(f"""
         <div style='background: {color}; padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
             <h4>🌿 PAR占比评价: {par_rating}</h4>
@@ -2485,7 +3064,7 @@ def display_results(results, df):
     
     with col1:
         leafy_score = results['calculations']['crop_suitability']['叶菜类']
-        leafy_color = "#28a745" if leafy_score >= 80 else "#ffc107" if leafy_score >= 60 else "#dc3545"
+        leafy_color = classify_by_thresholds(leafy_score, SCORE_RATING_THRESHOLDS, RATING_COLORS, inclusive=True)
         st.markdown(f"""
         <div style='background: {leafy_color}; padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
             <h4>🥬 叶菜类适应性</h4>
@@ -2496,7 +3075,7 @@ def display_results(results, df):
     
     with col2:
         fruit_score = results['calculations']['crop_suitability']['果菜类']
-        fruit_color = "#28a745" if fruit_score >= 80 else "#ffc107" if fruit_score >= 60 else "#dc3545"
+        fruit_color = classify_by_thresholds(fruit_score, SCORE_RATING_THRESHOLDS, RATING_COLORS, inclusive=True)
         st.markdown(f"""
         <div style='background: {fruit_color}; padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
             <h4>🍅 果菜类适应性</h4>
@@ -2507,7 +3086,7 @@ def display_results(results, df):
     
     with col3:
         seedling_score = results['calculations']['crop_suitability']['育苗专用']
-        seedling_color = "#28a745" if seedling_score >= 80 else "#ffc107" if seedling_score >= 60 else "#dc3545"
+        seedling_color = classify_by_thresholds(seedling_score, SCORE_RATING_THRESHOLDS, RATING_COLORS, inclusive=True)
         st.markdown(f"""
         <div style='background: {seedling_color}; padding: 1rem; border-radius: 10px; text-align: center; color: white;'>
             <h4>🌱 育苗专用适应性</h4>
@@ -2524,24 +3103,8 @@ def display_results(results, df):
     stage_names = list(results['calculations']['growth_stage_suitability'].keys())
     stage_scores = list(results['calculations']['growth_stage_suitability'].values())
     
-    # 创建生长阶段适配性柱状图
-    fig_stages = go.Figure(data=[
-        go.Bar(
-            x=stage_names, 
-            y=stage_scores,
-            marker_color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7'],
-            text=[f'{score}分' for score in stage_scores],
-            textposition='auto'
-        )
-    ])
-    
-    fig_stages.update_layout(
-        title="不同生长阶段适配性评分",
-        xaxis_title="生长阶段",
-        yaxis_title="适配性评分",
-        height=400,
-        yaxis=dict(range=[0, 100])
-    )
+    # 创建生长阶段适配性柱状图（相同评分时直接复用缓存的图表）
+    fig_stages = build_growth_stage_figure(tuple(stage_names), tuple(stage_scores))
     
     st.plotly_chart(fig_stages, use_container_width=True)
     
@@ -2566,38 +3129,8 @@ def display_results(results, df):
     
     with col2:
         # 光谱质量雷达图
-        categories = ['完整性', '平衡性', 'PAR占比', 'PPE性能', '红蓝比适宜度']
-        
-        # 计算各维度得分（0-1标准化）
-        completeness_score = results['calculations']['spectral_completeness']
-        balance_score = results['calculations']['spectral_balance']
-        par_score = min(results['calculations']['par_ratio'] / 0.9, 1.0)  # 以0.9为满分
-        ppe_score = min(results['calculations']['ppe'] / 3.0, 1.0)  # 以3.0为满分
-        rb_score = 1.0 if 0.5 <= results['calculations']['r_b_ratio'] <= 3.0 else 0.5
-        
-        scores = [completeness_score, balance_score, par_score, ppe_score, rb_score]
-        
-        fig_radar = go.Figure()
-        
-        fig_radar.add_trace(go.Scatterpolar(
-            r=scores,
-            theta=categories,
-            fill='toself',
-            name='当前光谱',
-            fillcolor='rgba(0, 123, 255, 0.3)',
-            line_color='rgba(0, 123, 255, 1)'
-        ))
-        
-        fig_radar.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 1]
-                )),
-            showlegend=True,
-            title="光谱质量雷达图",
-            height=400
-        )
+        scores = calculate_spectral_quality_scores(results['calculations'])
+        fig_radar = build_spectral_quality_radar(tuple(scores))
         
         st.plotly_chart(fig_radar, use_container_width=True)
     
@@ -2640,7 +3173,7 @@ def display_results(results, df):
     
     suggestions = results['calculations']['optimization_suggestions']
     
-    if len(suggestions) == 1 and "较为合理" in suggestions[0]:
+    if suggestions == [DEFAULT_OPTIMIZATION_SUGGESTION]:
         st.success("🎉 " + suggestions[0])
     else:
         st.warning("📋 检测到以下可优化项目：")
@@ -2655,12 +3188,11 @@ def display_results(results, df):
     }
     
     for suggestion in suggestions:
-        if "PPE" in suggestion or "PAR" in suggestion:
-            priority_suggestions["高优先级"].append(suggestion)
-        elif "红蓝比" in suggestion or "热损失" in suggestion:
-            priority_suggestions["中优先级"].append(suggestion)
-        else:
-            priority_suggestions["低优先级"].append(suggestion)
+        level = next(
+            (level for level, pattern in SUGGESTION_PRIORITY_PATTERNS if pattern.search(suggestion)),
+            LOW_PRIORITY_LEVEL
+        )
+        priority_suggestions[level].append(suggestion)
     
     if any(priority_suggestions.values()):
         st.markdown("#### 🎯 优化建议优先级")
@@ -2708,284 +3240,40 @@ def display_results(results, df):
     st.subheader("光质分布占比")
     
     # 光质占比饼图
-    colors = ['#4285F4', '#34A853', '#EA4335', "#FB04DA"]  # 蓝、绿、红、远红
-    labels = ['蓝光 (400-500nm)', '绿光 (500-600nm)', '红光 (600-700nm)', '远红光 (700-800nm)']
-    values = [
+    fig_pie = build_light_quality_pie((
         results['percentages']['blue_percentage'],
         results['percentages']['green_percentage'],
         results['percentages']['red_percentage'],
         results['percentages']['far_red_percentage']
-    ]
-    
-    fig_pie = go.Figure(data=[go.Pie(
-        labels=labels, 
-        values=values,
-        marker_colors=colors,
-        textinfo='label+percent',
-        textfont_size=12
-    )])
-    
-    fig_pie.update_layout(
-        title="光质分布占比",
-        font=dict(size=14),
-        height=500
-    )
+    ))
     
     st.plotly_chart(fig_pie, use_container_width=True)
     
     # 光谱分布图
     st.subheader("光谱分布图")
     
-    fig_spectrum = go.Figure()
-    
-    # 使用Rainbow颜色映射创建连续的光谱颜色填充
-    def wavelength_to_rgb(wavelength):
-        """将波长转换为RGB颜色值 (基于可见光谱)"""
-        if wavelength < 380:
-            return (0.5, 0.0, 1.0)  # 紫外线区域显示为紫色
-        elif wavelength < 440:
-            # 紫到蓝
-            t = (wavelength - 380) / (440 - 380)
-            return (0.5 - 0.5*t, 0.0, 1.0)
-        elif wavelength < 490:
-            # 蓝到青
-            t = (wavelength - 440) / (490 - 440)
-            return (0.0, t, 1.0)
-        elif wavelength < 510:
-            # 青到绿
-            t = (wavelength - 490) / (510 - 490)
-            return (0.0, 1.0, 1.0 - t)
-        elif wavelength < 580:
-            # 绿到黄
-            t = (wavelength - 510) / (580 - 510)
-            return (t, 1.0, 0.0)
-        elif wavelength < 645:
-            # 黄到橙
-            t = (wavelength - 580) / (645 - 580)
-            return (1.0, 1.0 - 0.5*t, 0.0)
-        elif wavelength < 750:
-            # 橙到红
-            t = (wavelength - 645) / (750 - 645)
-            return (1.0, 0.5 - 0.5*t, 0.0)
-        else:
-            # 红外线区域显示为深红
-            return (0.5, 0.0, 0.0)
-    
-    # 创建连续的彩虹填充效果
-    wavelengths = df['wavelength'].values
-    radiations = df['radiation'].values
+    wavelengths = df['wavelength'].to_numpy(dtype=np.float64, copy=False)
+    radiations = df['radiation'].to_numpy(dtype=np.float64, copy=False)
     
     # 数据检查
     if len(wavelengths) == 0 or len(radiations) == 0:
         st.warning("光谱数据为空，无法显示光谱分布图")
         return
     
-    try:
-        # 按小段创建填充，每段使用对应的光谱颜色
-        step = 5  # 每5nm一个颜色段
-        min_wave = int(wavelengths.min())
-        max_wave = int(wavelengths.max())
-        
-        # 检查波长范围是否合理
-        if min_wave >= max_wave or max_wave - min_wave < 10:
-            st.warning("波长数据范围异常，使用简化显示")
-            # 使用简化的图表
-            fig_spectrum = go.Figure()
-            fig_spectrum.add_trace(go.Scatter(
-                x=wavelengths,
-                y=radiations,
-                mode='lines+markers',
-                name='光谱强度',
-                line=dict(color='blue', width=2)
-            ))
-        else:
-            fig_spectrum = go.Figure()
-            
-            for wave_start in range(min_wave, max_wave, step):
-                wave_end = min(wave_start + step, max_wave)
-                
-                # 筛选该波长范围内的数据
-                mask = (wavelengths >= wave_start) & (wavelengths < wave_end)
-                if np.any(mask):
-                    range_waves = wavelengths[mask]
-                    range_rads = radiations[mask]
-                    
-                    if len(range_waves) > 0:
-                        # 计算该范围的中心波长用于颜色映射
-                        center_wave = (wave_start + wave_end) / 2
-                        r, g, b = wavelength_to_rgb(center_wave)
-                        color = f'rgba({int(r*255)}, {int(g*255)}, {int(b*255)}, 0.7)'
-                        
-                        # 创建填充区域
-                        x_fill = [wave_start] + list(range_waves) + [wave_end]
-                        y_fill = [0] + list(range_rads) + [0]
-                        
-                        fig_spectrum.add_trace(go.Scatter(
-                            x=x_fill,
-                            y=y_fill,
-                            fill='tozeroy',
-                            fillcolor=color,
-                            line=dict(color=color, width=0),
-                            mode='lines',
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ))
-            
-            # 添加整体光谱线条作为轮廓
-            fig_spectrum.add_trace(go.Scatter(
-                x=df['wavelength'],
-                y=df['radiation'],
-                mode='lines',
-                name='光谱强度',
-                line=dict(color='black', width=2),
-                opacity=0.8
-            ))
-    
-    except Exception as e:
-        st.error(f"生成光谱分布图时出错: {str(e)}")
-        # 使用简化的图表作为后备
-        fig_spectrum = go.Figure()
-        fig_spectrum.add_trace(go.Scatter(
-            x=wavelengths,
-            y=radiations,
-            mode='lines+markers',
-            name='光谱强度',
-            line=dict(color='blue', width=2)
-        ))
-    
-    # 添加波长范围标注
-    wavelength_ranges = [
-        (400, 500, '蓝光'),
-        (500, 600, '绿光'),  
-        (600, 700, '红光'),
-        (700, 800, '远红光')
-    ]
-    
-    for min_wave, max_wave, label in wavelength_ranges:
-        # 在对应区域添加文字标注
-        center_wave = (min_wave + max_wave) / 2
-        mask = (df['wavelength'] >= min_wave) & (df['wavelength'] < max_wave)
-        if np.any(mask):
-            max_y = df[mask]['radiation'].max()
-            fig_spectrum.add_annotation(
-                x=center_wave,
-                y=max_y * 1.1,
-                text=label,
-                showarrow=False,
-                font=dict(size=12, color='black'),
-                bgcolor='rgba(255, 255, 255, 0.8)',
-                bordercolor='black',
-                borderwidth=1
-            )
-    
-    fig_spectrum.update_layout(
-        title="LED光谱分布 (彩虹色谱)",
-        xaxis_title="波长 (nm)",
-        yaxis_title="辐射强度",
-        height=500,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom", 
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        plot_bgcolor='white'
-    )
-    
-    st.plotly_chart(fig_spectrum, use_container_width=True)
+    render_spectrum_panel(wavelengths, radiations)
     
     # 植物光合敏感曲线对比图
     st.subheader("🌱 植物光合敏感曲线分析 (McCree 1972)")
     
-    # 生成植物光合敏感曲线数据
-    wavelength_range = np.arange(380, 780, 1)
-    
-    def plant_photosynthetic_response_viz(wavelength):
-        """用于可视化的植物光合敏感曲线"""
-        if wavelength < 400 or wavelength > 700:
-            return 0.0
-        elif wavelength <= 550:
-            return np.exp(-0.5 * ((wavelength - 430) / 40) ** 2) * 0.8 + \
-                   np.exp(-0.5 * ((wavelength - 470) / 30) ** 2) * 0.6
-        else:
-            return np.exp(-0.5 * ((wavelength - 630) / 35) ** 2) * 0.9 + \
-                   np.exp(-0.5 * ((wavelength - 670) / 25) ** 2) * 0.7
-    
-    def human_eye_response(wavelength):
-        """人眼视见函数V(λ)近似"""
-        if wavelength < 380 or wavelength > 780:
-            return 0.0
-        else:
-            return np.exp(-0.5 * ((wavelength - 555) / 100) ** 2)
-    
-    plant_response_curve = [plant_photosynthetic_response_viz(w) for w in wavelength_range]
-    human_response_curve = [human_eye_response(w) for w in wavelength_range]
-    
-    fig_comparison = go.Figure()
-    
-    # 植物光合敏感曲线
-    fig_comparison.add_trace(go.Scatter(
-        x=wavelength_range,
-        y=plant_response_curve,
-        mode='lines',
-        name='植物光合敏感曲线 P(λ)',
-        line=dict(color='#2E8B57', width=3),
-        fill='tozeroy',
-        fillcolor='rgba(46, 139, 87, 0.3)'
-    ))
-    
-    # 人眼视见函数
-    fig_comparison.add_trace(go.Scatter(
-        x=wavelength_range,
-        y=human_response_curve,
-        mode='lines',
-        name='人眼视见函数 V(λ)',
-        line=dict(color='#FF6347', width=3, dash='dash'),
-        fill='tozeroy',
-        fillcolor='rgba(255, 99, 71, 0.2)'
-    ))
+    fig_comparison = build_comparison_figure(wavelengths, radiations)
     
-    # 添加实际光谱数据（归一化）
-    if len(df) > 0:
-        normalized_spectrum = df['radiation'] / df['radiation'].max()
-        fig_comparison.add_trace(go.Scatter(
-            x=df['wavelength'],
-            y=normalized_spectrum,
-            mode='lines',
-            name='测试光谱 (归一化)',
-            line=dict(color='#4169E1', width=2),
-            opacity=0.8
-        ))
+    st.plotly_chart(fig_comparison, use_container_width=True, config=DENSE_PLOT_CONFIG)
     
-    fig_comparison.update_layout(
-        title="光学度量体系对比分析",
-        xaxis_title="波长 (nm)",
-        yaxis_title="相对响应",
-        height=400,
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        plot_bgcolor='white'
+    # 结果表格按计算结果缓存，重复渲染时不再重新构建DataFrame
+    comparison_df, performance_df, spectrum_df = build_result_tables(
+        results['calculations'], results['percentages']
     )
     
-    # 添加重要波长标注
-    important_wavelengths = [
-        (430, "蓝光峰值", "#0000FF"),
-        (555, "人眼峰值", "#00FF00"), 
-        (630, "红光峰值1", "#FF0000"),
-        (670, "红光峰值2", "#8B0000")
-    ]
-    
-    for wl, label, color in important_wavelengths:
-        fig_comparison.add_vline(
-            x=wl, line_dash="dot", line_color=color,
-            annotation_text=f"{label}\n{wl}nm",
-            annotation_position="top"
-        )
-    
-    st.plotly_chart(fig_comparison, use_container_width=True)
-    
     # 植物光子度量学分析
     col1, col2 = st.columns(2)
     
@@ -3001,21 +3289,6 @@ def display_results(results, df):
     
     with col2:
         st.markdown("#### 📊 四种度量体系对比")
-        comparison_data = {
-            "度量体系": [
-                "辐射度学", "光度学", "光子度量学", "植物光子度量学"
-            ],
-            "核心参数": [
-                f"{results['calculations']['total_integration']:.2f}",
-                "基于人眼V(λ)",
-                f"{results['calculations']['ppe']:.3f} μmol/J",
-                f"{results['calculations']['plant_photon_efficacy']:.3f}"
-            ],
-            "适用场景": [
-                "能量评价", "人因照明", "植物照明标准", "精准植物照明"
-            ]
-        }
-        comparison_df = pd.DataFrame(comparison_data)
         st.dataframe(comparison_df, use_container_width=True, hide_index=True)
     
     st.markdown("---")
@@ -3028,64 +3301,10 @@ def display_results(results, df):
     
     with col1:
         st.markdown("#### 🎯 性能指标")
-        performance_data = {
-            "指标": [
-                "PPE (新标准)", "总光子通量", "PAR占比", "光能比", 
-                "R/B比", "R/Fr比", "PAR功率", "光效"
-            ],
-            "数值": [
-                f"{results['calculations']['ppe']:.3f} μmol/J",
-                f"{results['calculations']['total_photon_flux']:.2f} μmol/s",
-                f"{results['calculations']['par_ratio']:.3f}",
-                f"{results['calculations']['light_energy_ratio']:.3f}",
-                f"{results['calculations']['r_b_ratio']:.2f}",
-                f"{results['calculations']['r_fr_ratio']:.2f}",
-                f"{results['calculations']['par_power']:.2f} W",
-                f"{results['calculations']['luminous_efficacy']:.3f} W/W"
-            ],
-            "说明": [
-                "总光子通量/总功率",
-                "总辐射通量×光能比",
-                "光合有效辐射比例",
-                "光合有效积分/总积分",
-                "红蓝光比例",
-                "红远红光比例",
-                "PAR波段功率",
-                "辐射光效"
-            ]
-        }
-        performance_df = pd.DataFrame(performance_data)
         st.dataframe(performance_df, use_container_width=True, hide_index=True)
     
     with col2:
         st.markdown("#### 🌈 光谱积分")
-        spectrum_data = {
-            "波段": [
-                "光合有效积分", "总积分", "PAR积分 (400-700nm)",
-                "蓝光积分 (400-500nm)", "绿光积分 (500-600nm)",
-                "红光积分 (600-700nm)", "远红光积分 (700-800nm)",
-                "光质总和积分"
-            ],
-            "数值": [
-                f"{results['calculations']['photosynthetic_active']:.2f}",
-                f"{results['calculations']['total_integration']:.2f}",
-                f"{results['calculations']['par_integration']:.2f}",
-                f"{results['calculations']['blue_integration']:.2f}",
-                f"{results['calculations']['green_integration']:.2f}",
-                f"{results['calculations']['red_integration']:.2f}",
-                f"{results['calculations']['far_red_integration']:.2f}",
-                f"{results['calculations']['light_quality_total']:.2f}"
-            ],
-            "占比 (%)": [
-                "-", "-", f"{results['calculations']['par_ratio']*100:.1f}%",
-                f"{results['percentages']['blue_percentage']:.1f}%",
-                f"{results['percentages']['green_percentage']:.1f}%",
-                f"{results['percentages']['red_percentage']:.1f}%",
-                f"{results['percentages']['far_red_percentage']:.1f}%",
-                "100.0%"
-            ]
-        }
-        spectrum_df = pd.DataFrame(spectrum_data)
         st.dataframe(spectrum_df, use_container_width=True, hide_index=True)
     
     # 添加一个综合评价卡片
@@ -3093,8 +3312,8 @@ def display_results(results, df):
     st.subheader("📈 综合评价")
     
     # 计算一些评价指标
-    ppe_rating = "优秀" if results['calculations']['ppe'] > 2.5 else "良好" if results['calculations']['ppe'] > 2.0 else "一般"
-    par_rating = "优秀" if results['calculations']['par_ratio'] > 0.8 else "良好" if results['calculations']['par_ratio'] > 0.6 else "一般"
+    ppe_rating = classify_by_thresholds(results['calculations']['ppe'], PPE_RATING_THRESHOLDS, RATING_LABELS)
+    par_rating = classify_by_thresholds(results['calculations']['par_ratio'], PAR_RATING_THRESHOLDS, RATING_LABELS)
     
     col1, col2, col3 = st.columns(3)
     
@@ -3148,116 +3367,7 @@ def display_results(results, df):
         """)
     
     with col2:
-        # 生成报告内容
-        if PDF_AVAILABLE:
-            try:
-                report_data = generate_pdf_report(results, df)
-                mime_type = "application/pdf"
-                file_ext = ".pdf"
-                format_name = "PDF"
-                
-                # 生成文件名（包含灯具型号和日期）
-                lamp_model = results.get('basic_info', {}).get('lamp_model', 'Unknown')
-                test_date = results.get('basic_info', {}).get('test_date', 'Unknown')
-                
-                if lamp_model and lamp_model != '未填写' and lamp_model.strip():
-                    # 清理文件名中的特殊字符
-                    clean_model = "".join(c for c in lamp_model if c.isalnum() or c in (' ', '-', '_')).strip()
-                    filename = f"LED光谱分析报告_{clean_model}_{test_date}{file_ext}"
-                else:
-                    filename = f"LED光谱分析报告_{test_date}{file_ext}"
-                
-                st.download_button(
-                    label="📥 下载完整分析报告 (PDF)",
-                    data=report_data,
-                    file_name=filename,
-                    mime=mime_type,
-                    help="点击下载包含所有图表和分析数据的PDF报告",
-                    use_container_width=True
-                )
-                
-                st.success("✅ PDF报告生成成功！")
-                st.info("📊 报告包含完整图表和专业分析数据")
-                
-            except Exception as e:
-                st.error(f"❌ PDF报告生成失败：{str(e)}")
-                st.info("💡 请确保分析数据完整后重试")
-                # 显示详细错误信息用于调试
-                if st.checkbox("显示详细错误信息"):
-                    st.exception(e)
-        else:
-            # PDF库不可用时的处理
-            st.error("❌ PDF生成功能不可用")
-            
-            # 检查运行环境并给出相应建议
-            st.markdown("**💡 解决方案：**")
-            
-            with st.expander("🔧 在Streamlit Cloud上部署", expanded=True):
-                st.markdown("""
-                如果您在Streamlit Cloud上运行此应用，请确保您的GitHub仓库包含正确的 `requirements.txt` 文件：
-                
-                ```
-                streamlit>=1.28.0
-                pandas>=1.5.0
-                numpy>=1.21.0
-                plotly>=5.15.0
-                matplotlib>=3.7.0
-                seaborn>=0.12.0
-                reportlab>=4.0.0
-                Pillow>=10.0.0
-                openpyxl>=3.0.0
-                ```
-                
-                **部署步骤：**
-                1. 在您的GitHub仓库根目录创建/更新 `requirements.txt` 文件
-                2. 将上述内容添加到文件中
-                3. 提交并推送更改到GitHub
-                4. 在Streamlit Cloud中重新部署应用
-                5. 等待依赖库安装完成（通常需要几分钟）
-                """)
-            
-            with st.expander("💻 本地运行"):
-                st.markdown("""
-                如果您在本地运行此应用，请在终端中执行：
-                ```bash
-                pip install matplotlib seaborn reportlab Pillow
-                ```
-                然后重启应用。
-                """)
-            
-            st.markdown("**📄 临时解决方案：**")
-            st.info("当前将为您生成简化版HTML报告，包含主要分析数据但不含图表。")
-            
-            try:
-                report_data = generate_simplified_report(results, df)
-                mime_type = "text/html"
-                file_ext = ".html"
-                
-                # 生成文件名
-                lamp_model = results.get('basic_info', {}).get('lamp_model', 'Unknown')
-                test_date = results.get('basic_info', {}).get('test_date', 'Unknown')
-                
-                if lamp_model and lamp_model != '未填写' and lamp_model.strip():
-                    clean_model = "".join(c for c in lamp_model if c.isalnum() or c in (' ', '-', '_')).strip()
-                    filename = f"LED光谱分析报告_{clean_model}_{test_date}{file_ext}"
-                else:
-                    filename = f"LED光谱分析报告_{test_date}{file_ext}"
-                
-                st.download_button(
-                    label="📥 下载简化分析报告 (HTML)",
-                    data=report_data,
-                    file_name=filename,
-                    mime=mime_type,
-                    help="下载包含主要分析数据的HTML报告（不含图表）",
-                    use_container_width=True
-                )
-                
-                st.warning("⚠️ 当前为简化版HTML报告（不含图表）")
-                
-            except Exception as e:
-                st.error(f"❌ 报告生成失败：{str(e)}")
-                if st.checkbox("显示详细错误信息"):
-                    st.exception(e)
+        render_report_panel(results, df)
     
     st.markdown("---")
     st.markdown("""